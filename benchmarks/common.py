@@ -0,0 +1,10 @@
+import timeit
+
+
+def best_of(fn, repeat):
+    """Best time of one call to ``fn``, in seconds."""
+    number = 1
+    # Scale the number of runs so that cheap cases are still measurable
+    while timeit.timeit(fn, number=number) < 0.05 and number < 100_000:
+        number *= 10
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
@@ -0,0 +1,235 @@
+"""Headless benchmarks of the editor data paths, recorded as JSON.
+
+Times node scaling, color/opacity merging, histogram construction, state
+serialization and the VTK transfer function updates. Needs no GPU nor network,
+the VTK cases are skipped when VTK is not installed.
+
+Usage:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --compare baseline.json --threshold 1.25
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from functools import partial
+
+import msgpack
+import numpy as np
+from common import best_of
+
+import trame_color_opacity_editor
+from trame_color_opacity_editor.utils.histograms import MultiResolutionHistogram, compute_histogram
+from trame_color_opacity_editor.utils.nodes import merge_nodes
+from trame_color_opacity_editor.utils.transfer_function import (
+    ColorTransferFunction,
+    OpacityTransferFunction,
+)
+
+try:
+    from vtkmodules.vtkCommonCore import vtkVersion
+    from vtkmodules.vtkCommonDataModel import vtkPiecewiseFunction
+    from vtkmodules.vtkRenderingCore import vtkColorTransferFunction
+
+    from trame_color_opacity_editor.utils.vtk import (
+        update_color_function,
+        update_opacity_function,
+    )
+except ImportError:
+    vtkVersion = None
+
+DEFAULT_NODES = [2, 16, 256, 1000, 10000]
+DEFAULT_BINS = [256, 4096, 65536]
+
+
+def make_nodes(n, rng):
+    x = np.sort(rng.random(n)) * 255
+    opacity = OpacityTransferFunction(np.column_stack((x, rng.random(n))))
+    color = ColorTransferFunction(np.column_stack((x, rng.random((n, 3)))))
+    return opacity, color
+
+
+def make_volume(voxels, dtype, rng):
+    side = round(voxels ** (1 / 3))
+    shape = (side, side, side)
+
+    if np.dtype(dtype).kind == "f":
+        return rng.standard_normal(shape, dtype=dtype)
+
+    return rng.integers(0, np.iinfo(dtype).max, shape, dtype=dtype)
+
+
+class Recorder:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    def time(self, name, fn, **params):
+        seconds = best_of(fn, self.repeat)
+        self.results.append({"name": name, "params": params, "seconds": seconds})
+        print(f"{name:<32} {json.dumps(params):<48} {seconds * 1e3:>12.4f} ms")
+
+    def size(self, name, nbytes, **params):
+        self.results.append({"name": name, "params": params, "bytes": nbytes})
+        print(f"{name:<32} {json.dumps(params):<48} {nbytes:>12} B")
+
+
+def bench_nodes(recorder, sizes, rng):
+    for n in sizes:
+        opacity, color = make_nodes(n, rng)
+        opacity_nodes, color_nodes = opacity.to_nodes(), color.to_nodes()
+        x_range, y_range = [0, 255], [0, 1]
+
+        recorder.time("scale_opacity", lambda: opacity.scale(x_range, y_range), nodes=n)
+        recorder.time("scale_color", lambda: color.scale(x_range), nodes=n)
+        recorder.time("merge", lambda: merge_nodes(color_nodes, opacity_nodes), nodes=n)
+
+
+def bench_histograms(recorder, bins_list, voxels, rng):
+    for dtype in ["uint16", "float32"]:
+        data = make_volume(voxels, dtype, rng)
+
+        for bins in bins_list:
+            recorder.time(
+                "compute_histogram",
+                lambda: compute_histogram(data, bins=bins),
+                bins=bins,
+                dtype=dtype,
+                voxels=data.size,
+            )
+
+    histogram = MultiResolutionHistogram(compute_histogram(data, bins=max(bins_list)))
+    scalar_range = histogram.scalar_range
+    zoom = [scalar_range[0], (scalar_range[0] + scalar_range[1]) / 2]
+
+    for bins in bins_list:
+        recorder.time("rebin", lambda: histogram.rebin(zoom, bins=bins), bins=bins)
+
+
+def bench_serialization(recorder, sizes, bins_list, rng):
+    # trame sends the state with msgpack
+    cases = []
+
+    for bins in bins_list:
+        histogram = compute_histogram(rng.standard_normal(bins * 16), bins=bins)
+        packed = partial(histogram.histograms, packed=True)
+        cases.append(("histograms", {"bins": bins}, histogram.histograms, packed))
+
+    for n in sizes:
+        opacity, color = make_nodes(n, rng)
+        cases.append(("opacity_nodes", {"nodes": n}, opacity.to_nodes, opacity.to_packed))
+        cases.append(("color_nodes", {"nodes": n}, color.to_nodes, color.to_packed))
+
+    for kind, params, to_list, to_packed in cases:
+        for encoding, to_state in [("list", to_list), ("packed", to_packed)]:
+            recorder.time(
+                f"serialize_{kind}",
+                lambda: msgpack.packb(to_state()),
+                encoding=encoding,
+                **params,
+            )
+            recorder.size(
+                f"serialized_{kind}_size",
+                len(msgpack.packb(to_state())),
+                encoding=encoding,
+                **params,
+            )
+
+
+def bench_vtk(recorder, sizes, rng):
+    pwf = vtkPiecewiseFunction()
+    ctf = vtkColorTransferFunction()
+
+    for n in sizes:
+        opacity, color = make_nodes(n, rng)
+        opacity_nodes, color_nodes = opacity.to_nodes(), color.to_nodes()
+
+        recorder.time(
+            "vtk_update_opacity",
+            lambda: update_opacity_function(pwf, opacity_nodes, force=True),
+            nodes=n,
+        )
+        recorder.time(
+            "vtk_update_color",
+            lambda: update_color_function(ctf, color_nodes, force=True),
+            nodes=n,
+        )
+
+
+def metadata():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "version": trame_color_opacity_editor.__version__,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "vtk": None if vtkVersion is None else vtkVersion.GetVTKVersion(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def _key(result):
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """Print the cases slower than ``threshold`` times the baseline, return their number."""
+    reference = {_key(result): result for result in baseline["results"]}
+    regressions = 0
+
+    for result in results:
+        old = reference.get(_key(result))
+
+        if old is None or "seconds" not in result:
+            continue
+
+        ratio = result["seconds"] / old["seconds"]
+
+        if ratio > threshold:
+            regressions += 1
+            print(f"SLOWER x{ratio:.2f}: {result['name']} {json.dumps(result['params'])}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=DEFAULT_NODES)
+    parser.add_argument("--bins", type=int, nargs="+", default=DEFAULT_BINS)
+    parser.add_argument("--voxels", type=int, default=128**3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    recorder = Recorder(args.repeat)
+
+    bench_nodes(recorder, args.nodes, rng)
+    bench_histograms(recorder, args.bins, args.voxels, rng)
+    bench_serialization(recorder, args.nodes, args.bins, rng)
+
+    if vtkVersion is not None:
+        bench_vtk(recorder, args.nodes, rng)
+    else:
+        print("VTK is not installed, skipping the VTK benchmarks")
+
+    report = {"metadata": metadata(), "results": recorder.results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(recorder.results, json.load(f), args.threshold)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
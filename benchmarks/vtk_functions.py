@@ -0,0 +1,69 @@
+"""Compare the per-point AddPoint/AddRGBPoint loop with the bulk VTK update helpers.
+
+Usage:
+    python benchmarks/vtk_functions.py --sizes 2 256 1000 10000
+"""
+
+import argparse
+
+import numpy as np
+from common import best_of
+from vtkmodules.vtkCommonDataModel import vtkPiecewiseFunction
+from vtkmodules.vtkRenderingCore import vtkColorTransferFunction
+
+from trame_color_opacity_editor.utils.vtk import update_color_function, update_opacity_function
+
+
+def make_nodes(n, rng):
+    x = np.linspace(0, 255, n)
+    opacity_nodes = [[float(v), float(o)] for v, o in zip(x, rng.random(n))]
+    color_nodes = [[float(v), [float(c) for c in rgb]] for v, rgb in zip(x, rng.random((n, 3)))]
+    return opacity_nodes, color_nodes
+
+
+def loop_opacity(pwf, nodes):
+    pwf.RemoveAllPoints()
+    for node in nodes:
+        pwf.AddPoint(node[0], node[1])
+
+
+def loop_color(ctf, nodes):
+    ctf.RemoveAllPoints()
+    for node in nodes:
+        ctf.AddRGBPoint(node[0], *node[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 16, 256, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pwf = vtkPiecewiseFunction()
+    ctf = vtkColorTransferFunction()
+
+    print(f"{'nodes':>8} {'kind':>8} {'loop [ms]':>12} {'bulk [ms]':>12} {'noop [ms]':>12}")
+
+    for n in args.sizes:
+        opacity_nodes, color_nodes = make_nodes(n, rng)
+
+        cases = [
+            ("opacity", pwf, opacity_nodes, loop_opacity, update_opacity_function),
+            ("color", ctf, color_nodes, loop_color, update_color_function),
+        ]
+
+        for kind, function, nodes, loop, update in cases:
+            loop_time = best_of(lambda: loop(function, nodes), args.repeat)
+            bulk_time = best_of(lambda: update(function, nodes, force=True), args.repeat)
+            # Unchanged content, the rebuild is skipped
+            noop_time = best_of(lambda: update(function, nodes), args.repeat)
+
+            print(
+                f"{n:>8} {kind:>8} {loop_time * 1e3:>12.4f} "
+                f"{bulk_time * 1e3:>12.4f} {noop_time * 1e3:>12.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,11 @@ from vtkmodules.vtkRenderingCore import (
 from vtkmodules.vtkRenderingVolume import vtkGPUVolumeRayCastMapper
 
 
+# Level of detail while the transfer function is being edited, see start_interactive_editing
+INTERACTIVE_SAMPLE_DISTANCE_FACTOR = 4
+INTERACTIVE_IMAGE_SAMPLE_DISTANCE = 2
+
+
 class VolumeView:
     def __init__(self):
         # Set up the VTK volume
@@ -70,22 +75,101 @@ class VolumeView:
         self.renderer = ren
         self.render_window = ren_win
         self.volume_data = volume_data
+        self.volume_mapper = volume_mapper
         self.volume_property = volume_property
+        self.interactive_editing = False
+        self._full_quality = None
+
+        # The NumPy array whose buffer VTK renders from, see set_data
+        self.array = None
+        self._owns_array = False
+
+    def set_data(self, data, copy=True):
+        """Render ``data``, sharing its buffer with VTK rather than copying it into VTK.
+
+        With ``copy=True`` the data is copied once into a buffer owned by the view.
+        When the next data has the same shape and dtype (e.g. time steps), it is copied
+        into that buffer in place, without reallocating.
+
+        With ``copy=False`` VTK renders straight from the buffer of ``data``, which is
+        kept alive by the view until the next ``set_data``. Modifying ``data`` in place
+        is then visible after ``data_modified()``. Arrays that are not C-contiguous in
+        native byte order still need one copy.
+        """
+        if copy and self._owns_array and same_layout(self.array, data):
+            np.copyto(self.array, data)
+            self.data_modified()
+            return
+
+        array = np.asarray(data)
+        dtype = array.dtype.newbyteorder("=")
+
+        if copy:
+            array = np.array(array, dtype=dtype, order="C")
+        else:
+            array = np.ascontiguousarray(array, dtype=dtype)
+
+        self.array = array
+        # A copy was made when the data could not be shared as is
+        self._owns_array = copy or not np.shares_memory(array, data)
 
-    def set_data(self, data):
         # We use C ordering throughout the application, but VTK uses
         # Fortran ordering. Reverse the shape to fix this.
-        shape = data.shape
-        set_array_to_image_data(data.ravel(), self.volume_data, shape)
+        shape = array.shape
+        set_array_to_image_data(array, self.volume_data, shape)
 
         self.volume_data.Modified()
         self.render_window.Render()
 
+    def start_interactive_editing(self):
+        """Render at a lower level of detail, e.g. while a handle of the editor is dragged.
+
+        Rays are cast through fewer pixels, with fewer samples along each ray.
+        """
+        if self.interactive_editing:
+            return
+
+        mapper = self.volume_mapper
+        self._full_quality = (
+            mapper.GetAutoAdjustSampleDistances(),
+            mapper.GetSampleDistance(),
+            mapper.GetImageSampleDistance(),
+        )
+
+        spacing = min(self.volume_data.GetSpacing())
+        mapper.AutoAdjustSampleDistancesOff()
+        mapper.SetSampleDistance(spacing * INTERACTIVE_SAMPLE_DISTANCE_FACTOR)
+        mapper.SetImageSampleDistance(INTERACTIVE_IMAGE_SAMPLE_DISTANCE)
+        self.interactive_editing = True
+
+    def end_interactive_editing(self):
+        """Go back to full quality, the caller renders the final frame."""
+        if not self.interactive_editing:
+            return
+
+        auto_adjust, sample_distance, image_sample_distance = self._full_quality
+        mapper = self.volume_mapper
+        mapper.SetAutoAdjustSampleDistances(auto_adjust)
+        mapper.SetSampleDistance(sample_distance)
+        mapper.SetImageSampleDistance(image_sample_distance)
+        self.interactive_editing = False
+
+    def data_modified(self):
+        """Render again after the array shared with VTK was modified in place."""
+        self.volume_data.GetPointData().GetScalars().Modified()
+        self.volume_data.Modified()
+        self.render_window.Render()
+
+
+def same_layout(array, data) -> bool:
+    return array is not None and array.shape == data.shape and array.dtype == data.dtype
+
 
 def set_array_to_image_data(
     array: np.ndarray, image_data: vtkImageData, shape: tuple[int], clear=True
 ):
-    vtk_array = np_s.numpy_to_vtk(array, deep=True)
+    # The VTK array points to the NumPy buffer (zero-copy), the caller keeps it alive
+    vtk_array = np_s.numpy_to_vtk(array.reshape(-1), deep=False)
     image_data.SetDimensions(shape)
     pd = image_data.GetPointData()
 
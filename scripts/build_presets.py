@@ -0,0 +1,51 @@
+"""Regenerate the presets shipped with the package from the matplotlib colormaps.
+
+pip install matplotlib
+python scripts/build_presets.py
+"""
+
+import matplotlib
+import numpy as np
+
+from trame_color_opacity_editor.utils.presets import DEFAULT_PRESETS_PATH, write_presets
+
+# Number of nodes sampled from each colormap
+SAMPLES = 16
+
+# Listed colormaps with fewer colors are qualitative, they don't interpolate well
+MIN_LISTED_COLORS = 64
+
+FIRST = ["viridis", "cividis", "plasma", "inferno", "jet"]
+
+
+def sample(colormap, samples=SAMPLES):
+    x = np.linspace(0, 1, samples)
+    return np.column_stack((x, colormap(x)[:, :3]))
+
+
+def main():
+    presets = {
+        "RBG": {"color": [[0, 1, 0, 0], [0.5, 0, 0, 1], [1, 0, 1, 0]]},
+        "WB": {"color": [[0, 1, 1, 1], [1, 0, 0, 0]]},
+    }
+
+    names = [
+        name
+        for name, colormap in sorted(matplotlib.colormaps.items())
+        if not name.endswith("_r")
+        and not (
+            isinstance(colormap, matplotlib.colors.ListedColormap)
+            and colormap.N < MIN_LISTED_COLORS
+        )
+    ]
+    names = FIRST + [name for name in names if name not in FIRST]
+
+    for name in names:
+        presets[name] = {"color": sample(matplotlib.colormaps[name])}
+
+    write_presets(DEFAULT_PRESETS_PATH, presets)
+    print(f"Wrote {len(presets)} presets to {DEFAULT_PRESETS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Thumbnails of the colormap presets rasterized into a single sprite atlas.
+
+The atlas is a PNG with one ``width x height`` swatch per preset, stacked
+vertically in the order of ``PresetLibrary.names()``. It is cached on disk,
+keyed by the hash of the preset file and the swatch size, so it is only
+rasterized once per preset file.
+"""
+
+import os
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.cache import DEFAULT_CACHE_DIR
+from trame_color_opacity_editor.utils.lut import bake_lut
+from trame_color_opacity_editor.utils.presets import PresetLibrary, get_presets
+
+__all__ = [
+    "DEFAULT_CACHE_DIR",
+    "PresetAtlas",
+    "encode_png",
+    "get_preset_atlas",
+]
+
+# Bump when the rasterization changes to invalidate the cached atlases
+_ATLAS_VERSION = 1
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    chunk = kind + data
+    return struct.pack(">I", len(data)) + chunk + struct.pack(">I", zlib.crc32(chunk))
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode a ``(height, width, 4)`` uint8 image as a PNG."""
+    height, width, _ = rgba.shape
+    # Every scanline starts with its filter type, 0 (none)
+    scanlines = np.zeros((height, 1 + 4 * width), dtype=np.uint8)
+    scanlines[:, 1:] = rgba.reshape(height, 4 * width)
+
+    return b"".join(
+        (
+            b"\x89PNG\r\n\x1a\n",
+            _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+            _png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 9)),
+            _png_chunk(b"IEND", b""),
+        )
+    )
+
+
+class PresetAtlas:
+    """Sprite atlas of the presets of a ``PresetLibrary``.
+
+    Args:
+        presets: The library, defaults to the presets shipped with the package.
+        swatch_size: ``[width, height]`` of each swatch in pixels.
+        cache_dir: Directory of the cached atlases, ``None`` to disable the disk cache.
+    """
+
+    def __init__(
+        self,
+        presets: PresetLibrary | None = None,
+        swatch_size=(128, 16),
+        cache_dir=DEFAULT_CACHE_DIR,
+    ):
+        self.presets = get_presets() if presets is None else presets
+        self.swatch_size = [int(swatch_size[0]), int(swatch_size[1])]
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self._png = None
+
+    @property
+    def names(self) -> list[str]:
+        return self.presets.names()
+
+    @property
+    def key(self) -> str:
+        width, height = self.swatch_size
+        return f"presets-{self.presets.digest()}-{width}x{height}-v{_ATLAS_VERSION}"
+
+    @property
+    def path(self) -> Path | None:
+        return None if self.cache_dir is None else self.cache_dir / f"{self.key}.png"
+
+    def offset(self, name: str) -> int:
+        """Vertical offset of the swatch of a preset in the atlas, in pixels."""
+        return self.names.index(name) * self.swatch_size[1]
+
+    def rasterize(self) -> np.ndarray:
+        """The ``(len(names) * height, width, 4)`` uint8 atlas image."""
+        width, height = self.swatch_size
+        rows = [
+            bake_lut(
+                self.presets.color_nodes(name, as_array=True),
+                size=width,
+                scalar_range=[0, 1],
+                dtype=np.uint8,
+                cache=False,
+            )
+            for name in self.names
+        ]
+
+        if not rows:
+            return np.zeros((0, width, 4), dtype=np.uint8)
+
+        return np.repeat(np.stack(rows), height, axis=0)
+
+    def png(self) -> bytes:
+        """The atlas encoded as a PNG, read from or written to the disk cache."""
+        if self._png is not None:
+            return self._png
+
+        path = self.path
+
+        if path is not None and path.exists():
+            self._png = path.read_bytes()
+            return self._png
+
+        self._png = encode_png(self.rasterize())
+
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent processes never read a partial file
+            partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+            partial.write_bytes(self._png)
+            partial.replace(path)
+
+        return self._png
+
+    def serve(self, server, name: str = "__trame_color_opacity_editor_atlas") -> str:
+        """Serve the atlas from ``server`` and return its URL, for ``PresetPicker(src=...)``."""
+        if self.cache_dir is None:
+            raise ValueError("Serving the atlas requires a cache_dir")
+
+        self.png()
+        server.enable_module({"serve": {name: str(self.cache_dir)}})
+
+        return f"{name}/{self.path.name}"
+
+
+_atlases = {}
+
+
+def get_preset_atlas(swatch_size=(128, 16)) -> PresetAtlas:
+    """The atlas of the presets shipped with the package."""
+    key = (int(swatch_size[0]), int(swatch_size[1]))
+
+    if key not in _atlases:
+        _atlases[key] = PresetAtlas(swatch_size=key)
+
+    return _atlases[key]
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+__all__ = [
+    "DEFAULT_CACHE_DIR",
+    "LRUCache",
+    "content_hash",
+]
+
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "trame-color-opacity-editor"
+)
+
+
+def content_hash(*parts) -> str:
+    """Hash arrays and scalars into a short hex digest, arrays are hashed by content."""
+    digest = hashlib.blake2b(digest_size=16)
+
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            array = np.ascontiguousarray(part)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(array.tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"|")
+
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """A thread-safe mapping that evicts the least recently used entries.
+
+    Args:
+        maxsize: Maximum number of entries kept.
+        max_bytes: Maximum total size of the entries kept, as measured by ``sizeof``.
+        sizeof: Size of a value in bytes, defaults to ``nbytes`` for arrays and ``0`` otherwise.
+    """
+
+    def __init__(self, maxsize: int = 128, max_bytes: int | None = None, sizeof=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or _nbytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            self.nbytes += size - self._sizes.get(key, 0)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+
+            # The latest entry is kept even when it exceeds the budget on its own
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None
+                and self.nbytes > self.max_bytes
+                and len(self._entries) > 1
+            ):
+                evicted, _ = self._entries.popitem(last=False)
+                self.nbytes -= self._sizes.pop(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+def _nbytes(value) -> int:
+    return int(getattr(value, "nbytes", 0))
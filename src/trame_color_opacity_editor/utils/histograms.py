@@ -0,0 +1,226 @@
+"""Histograms of large volumes, feeding the ``histograms`` / ``histograms_range`` props.
+
+The data is never materialized as a whole: it is read in slabs along its first
+axis, so anything that can be sliced that way works (``np.ndarray``,
+``np.memmap``, h5py or zarr datasets, ...). Slabs are processed by a thread pool.
+"""
+
+import operator
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.packing import pack_array
+from trame_color_opacity_editor.utils.slabs import DEFAULT_CHUNK_SIZE, read_slab, reduce_slabs
+
+__all__ = [
+    "Histogram",
+    "MultiResolutionHistogram",
+    "compute_histogram",
+    "compute_scalar_range",
+]
+
+
+class Histogram:
+    """Bin counts over uniform bins, convertible to the editor props.
+
+    Args:
+        counts: The number of values in each bin.
+        edges: The ``len(counts) + 1`` bin edges.
+    """
+
+    def __init__(self, counts: np.ndarray, edges: np.ndarray):
+        self.counts = counts
+        self.edges = edges
+
+    @property
+    def scalar_range(self) -> list[float]:
+        return [float(self.edges[0]), float(self.edges[-1])]
+
+    def values(self, log: bool = True) -> np.ndarray:
+        """The bin heights, ``log10(count)`` by default.
+
+        Bins with less than one count, empty or re-binned to a fraction of a count, are ``0``
+        rather than ``-inf`` or negative.
+        """
+        if not log:
+            return self.counts.astype(np.float64)
+
+        return np.log10(np.maximum(self.counts, 1), dtype=np.float64)
+
+    def histograms(self, log: bool = True, packed: bool = False) -> list[list[float]] | dict:
+        """The ``histograms`` prop of the editor, ``[[bin_start, value], ...]``.
+
+        With ``packed=True`` the bins are sent as a binary float32 buffer instead.
+        """
+        histograms = np.column_stack((self.edges[:-1], self.values(log)))
+
+        if packed:
+            return pack_array(histograms)
+
+        return histograms.tolist()
+
+    def histograms_range(self, log: bool = True) -> list[float]:
+        """The ``histograms_range`` prop of the editor."""
+        values = self.values(log)
+        top = float(values.max()) if len(values) else 0.0
+        return [0.0, top if top > 0 else 1.0]
+
+
+class MultiResolutionHistogram:
+    """A fine histogram that can be re-binned over any range without rescanning the data.
+
+    Re-binning interpolates the cumulative counts of the base histogram at the new
+    edges, so it costs ``O(bins * log(base_bins))`` regardless of the data size.
+    Counts are assumed to be evenly spread inside each base bin.
+
+    Args:
+        base: A histogram with many more bins than will ever be displayed,
+            e.g. ``compute_histogram(data, bins=65536)``.
+    """
+
+    def __init__(self, base: Histogram):
+        self.base = base
+        self._edges = base.edges.astype(np.float64)
+        self._cumulative = np.concatenate(([0.0], np.cumsum(base.counts, dtype=np.float64)))
+
+    @property
+    def scalar_range(self) -> list[float]:
+        return self.base.scalar_range
+
+    def rebin(self, scalar_range=None, bins: int = 251) -> Histogram:
+        """Histogram of ``bins`` uniform bins over ``scalar_range`` (the full range by default)."""
+        if scalar_range is None:
+            scalar_range = self.scalar_range
+
+        edges = np.linspace(scalar_range[0], scalar_range[1], bins + 1)
+        cumulative = np.interp(edges, self._edges, self._cumulative)
+
+        return Histogram(np.diff(cumulative), edges)
+
+
+def _union_range(a, b):
+    return min(a[0], b[0]), max(a[1], b[1])
+
+
+def _slab_range(data, slab: slice) -> tuple[float, float]:
+    chunk = read_slab(data, slab)
+
+    if chunk.dtype.kind == "f":
+        chunk = chunk[np.isfinite(chunk)]
+
+    if chunk.size == 0:
+        return np.inf, -np.inf
+
+    return chunk.min(), chunk.max()
+
+
+def compute_scalar_range(
+    data, chunk_size: int = DEFAULT_CHUNK_SIZE, max_workers: int | None = None
+) -> list[float]:
+    """Compute ``[min, max]`` of the finite values of ``data``, one slab at a time."""
+    lo, hi = reduce_slabs(
+        lambda slab: _slab_range(data, slab),
+        _union_range,
+        (np.inf, -np.inf),
+        data,
+        chunk_size,
+        max_workers,
+    )
+
+    if lo > hi:
+        return [0.0, 1.0]
+
+    return [float(lo), float(hi)]
+
+
+def is_small_int(dtype: np.dtype) -> bool:
+    """Whether values of ``dtype`` are counted exactly, one count per representable value.
+
+    Shared with the loaders that count the values while reading, see ``histogram_from_occurrences``.
+    """
+    return dtype.kind in "ui" and dtype.itemsize <= 2
+
+
+def _compute_small_int_histogram(
+    data, bins: int, scalar_range, chunk_size: int, max_workers: int | None
+) -> Histogram:
+    info = np.iinfo(data.dtype)
+    length = int(info.max) - int(info.min) + 1
+
+    def count(slab):
+        chunk = read_slab(data, slab)
+        if info.min != 0:
+            chunk = chunk.astype(np.int32) - info.min
+        return np.bincount(chunk, minlength=length)
+
+    # Exact number of occurrences of every representable value
+    occurrences = reduce_slabs(
+        count, operator.iadd, np.zeros(length, np.int64), data, chunk_size, max_workers
+    )
+
+    return histogram_from_occurrences(occurrences, data.dtype, bins, scalar_range)
+
+
+def histogram_from_occurrences(occurrences, dtype, bins: int, scalar_range=None) -> Histogram:
+    """The histogram of 8 or 16 bit integer data from the number of occurrences of each value.
+
+    Args:
+        occurrences: Count of every representable value of ``dtype``, from its minimum up.
+        dtype: The dtype of the data, see ``is_small_int``.
+        bins: Number of uniform bins.
+        scalar_range: ``[min, max]`` covered by the bins, defaults to the values present.
+    """
+    info = np.iinfo(dtype)
+    values = np.arange(info.min, info.max + 1)
+
+    if scalar_range is None:
+        present = np.flatnonzero(occurrences)
+        if len(present) == 0:
+            scalar_range = [0.0, 1.0]
+        else:
+            scalar_range = [float(values[present[0]]), float(values[present[-1]])]
+
+    # Re-binning the distinct values gives the same result as np.histogram on the data
+    counts, edges = np.histogram(values, bins=bins, range=scalar_range, weights=occurrences)
+
+    return Histogram(counts.astype(np.int64), edges)
+
+
+def compute_histogram(
+    data,
+    bins: int = 251,
+    scalar_range=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int | None = None,
+) -> Histogram:
+    """Compute the histogram of ``data`` without loading it in memory at once.
+
+    The result is identical to ``np.histogram(data, bins, range=scalar_range)``.
+    8 and 16 bit integer data is counted exactly with ``np.bincount`` in a single
+    pass, other types need a first pass to find the range when it isn't given.
+
+    Args:
+        data: Array-like sliceable along its first axis (ndarray, memmap, h5py, ...).
+        bins: Number of uniform bins.
+        scalar_range: ``[min, max]`` covered by the bins, defaults to the data range.
+        chunk_size: Approximate number of values read per slab.
+        max_workers: Size of the thread pool, ``1`` disables threading.
+    """
+    if is_small_int(np.dtype(data.dtype)):
+        return _compute_small_int_histogram(data, bins, scalar_range, chunk_size, max_workers)
+
+    if scalar_range is None:
+        scalar_range = compute_scalar_range(data, chunk_size, max_workers)
+
+    # numpy computes the edges in the precision of the data, e.g. float32
+    edges = np.histogram_bin_edges(np.empty(0, dtype=data.dtype), bins=bins, range=scalar_range)
+
+    def count(slab):
+        # Passing the range rather than the edges keeps numpy on its uniform bins fast path
+        return np.histogram(read_slab(data, slab), bins=bins, range=scalar_range)[0]
+
+    counts = reduce_slabs(
+        count, operator.iadd, np.zeros(bins, dtype=np.int64), data, chunk_size, max_workers
+    )
+
+    return Histogram(counts, edges)
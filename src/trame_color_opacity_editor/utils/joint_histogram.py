@@ -0,0 +1,204 @@
+"""Joint histograms of the values and of the gradient magnitude of a volume.
+
+The gradient is computed slab by slab along the first axis, each slab being
+read with one extra slice on both sides, so the gradient volume is never held in
+memory as a whole. Slabs are processed by a thread pool.
+"""
+
+import operator
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.atlas import encode_png
+from trame_color_opacity_editor.utils.slabs import DEFAULT_CHUNK_SIZE, reduce_slabs
+
+__all__ = [
+    "JointHistogram",
+    "compute_joint_histogram",
+]
+
+
+class JointHistogram:
+    """Counts of the ``(value, gradient magnitude)`` pairs over uniform bins.
+
+    Args:
+        counts: ``(value_bins, gradient_bins)`` counts.
+        value_edges: The ``value_bins + 1`` edges of the value bins.
+        gradient_edges: The ``gradient_bins + 1`` edges of the gradient magnitude bins.
+    """
+
+    def __init__(self, counts: np.ndarray, value_edges: np.ndarray, gradient_edges: np.ndarray):
+        self.counts = counts
+        self.value_edges = value_edges
+        self.gradient_edges = gradient_edges
+
+    @property
+    def scalar_range(self) -> list[float]:
+        return [float(self.value_edges[0]), float(self.value_edges[-1])]
+
+    @property
+    def gradient_range(self) -> list[float]:
+        return [float(self.gradient_edges[0]), float(self.gradient_edges[-1])]
+
+    def density(self, log: bool = True) -> np.ndarray:
+        """``(gradient_bins, value_bins)`` densities in ``[0, 1]``, the highest gradients first."""
+        counts = self.counts.astype(np.float64)
+
+        if log:
+            counts = np.log1p(counts)
+
+        top = counts.max(initial=0)
+        if top > 0:
+            counts /= top
+
+        # Rows of the image, from the top: gradient decreasing
+        return counts.T[::-1]
+
+    def to_image(self, log: bool = True, color=(0, 0, 0), store=None) -> dict:
+        """The ``jointHistogram`` prop of the editor.
+
+        The density is encoded as the alpha channel of a PNG of a single ``color``,
+        drawn over the background of the editor.
+
+        Args:
+            store: A ``ContentStore`` to put the PNG in, the prop then holds its URL.
+
+        Returns:
+            ``{"image": png bytes or URL, "range": [min, max]}``, ``range`` being the
+            values covered by the width of the image.
+        """
+        alpha = np.rint(self.density(log) * 255).astype(np.uint8)
+        rgba = np.empty((*alpha.shape, 4), dtype=np.uint8)
+        rgba[..., :3] = np.rint(np.asarray(color) * 255).astype(np.uint8)
+        rgba[..., 3] = alpha
+
+        image = encode_png(rgba)
+
+        if store is not None:
+            image = store.url(store.put(image))
+
+        return {"image": image, "range": self.scalar_range}
+
+
+def _read_with_halo(data, slab: slice) -> tuple[np.ndarray, slice]:
+    # One more slice on both sides, so central differences are exact at the slab boundaries
+    start = max(slab.start - 1, 0)
+    stop = min(slab.stop + 1, data.shape[0])
+    chunk = np.asarray(data[start:stop], dtype=np.float32)
+    rows = min(slab.stop, data.shape[0]) - slab.start
+    return chunk, slice(slab.start - start, slab.start - start + rows)
+
+
+def _gradient_magnitude(chunk: np.ndarray, inner: slice) -> np.ndarray:
+    squared = np.zeros(chunk[inner].shape, dtype=np.float32)
+
+    for axis, size in enumerate(chunk.shape):
+        # Axes of a single sample have no gradient
+        if size > 1:
+            squared += np.gradient(chunk, axis=axis)[inner] ** 2
+
+    return np.sqrt(squared, out=squared)
+
+
+def _slab_pairs(data, slab: slice) -> tuple[np.ndarray, np.ndarray]:
+    chunk, inner = _read_with_halo(data, slab)
+    values = chunk[inner].reshape(-1)
+    gradients = _gradient_magnitude(chunk, inner).reshape(-1)
+
+    finite = np.isfinite(values) & np.isfinite(gradients)
+    if not finite.all():
+        values, gradients = values[finite], gradients[finite]
+
+    return values, gradients
+
+
+def _slab_ranges(data, slab: slice):
+    values, gradients = _slab_pairs(data, slab)
+
+    if values.size == 0:
+        return np.inf, -np.inf, -np.inf
+
+    return values.min(), values.max(), gradients.max()
+
+
+def _union_ranges(a, b):
+    return min(a[0], b[0]), max(a[1], b[1]), max(a[2], b[2])
+
+
+def _bin_indices(x: np.ndarray, bins: int, range) -> tuple[np.ndarray, np.ndarray]:
+    lo, hi = range
+    span = hi - lo if hi > lo else 1.0
+    # In float32, values just below hi round up to bins
+    indices = np.floor((x.astype(np.float64) - lo) * (bins / span)).astype(np.int64)
+    # Like np.histogram, the last bin includes its right edge
+    np.minimum(indices, bins - 1, out=indices)
+    inside = (x >= lo) & (x <= hi)
+    return indices, inside
+
+
+def compute_joint_histogram(
+    data,
+    bins=(256, 128),
+    scalar_range=None,
+    gradient_range=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int | None = None,
+) -> JointHistogram:
+    """Compute the joint histogram of the values and gradient magnitude of ``data``.
+
+    The gradient is computed with central differences (one-sided at the borders),
+    with a unit spacing, like ``np.gradient``. When the ranges are not given, a first
+    pass finds them.
+
+    Args:
+        data: Array-like sliceable along its first axis (ndarray, memmap, h5py, ...).
+        bins: Number of ``(value, gradient magnitude)`` bins.
+        scalar_range: ``[min, max]`` of the values covered, defaults to the data range.
+        gradient_range: ``[min, max]`` of the gradient magnitudes covered,
+            defaults to ``[0, max]``.
+        chunk_size: Approximate number of values read per slab.
+        max_workers: Size of the thread pool, ``1`` disables threading.
+    """
+    value_bins, gradient_bins = bins
+
+    if scalar_range is None or gradient_range is None:
+        lo, hi, top = reduce_slabs(
+            lambda slab: _slab_ranges(data, slab),
+            _union_ranges,
+            (np.inf, -np.inf, -np.inf),
+            data,
+            chunk_size,
+            max_workers,
+        )
+
+        if scalar_range is None:
+            scalar_range = [float(lo), float(hi)] if lo <= hi else [0.0, 1.0]
+
+        if gradient_range is None:
+            gradient_range = [0.0, float(top) if top > 0 else 1.0]
+
+    def count(slab):
+        values, gradients = _slab_pairs(data, slab)
+        value_indices, value_inside = _bin_indices(values, value_bins, scalar_range)
+        gradient_indices, gradient_inside = _bin_indices(gradients, gradient_bins, gradient_range)
+        inside = value_inside & gradient_inside
+        flat = value_indices[inside] * gradient_bins + gradient_indices[inside]
+        return np.bincount(flat, minlength=value_bins * gradient_bins)
+
+    if data.shape[0] == 0:
+        counts = np.zeros(value_bins * gradient_bins, dtype=np.int64)
+    else:
+        counts = reduce_slabs(
+            count,
+            operator.iadd,
+            np.zeros(value_bins * gradient_bins, dtype=np.int64),
+            data,
+            chunk_size,
+            max_workers,
+        )
+
+    return JointHistogram(
+        counts.reshape(value_bins, gradient_bins),
+        np.linspace(scalar_range[0], scalar_range[1], value_bins + 1),
+        np.linspace(gradient_range[0], gradient_range[1], gradient_bins + 1),
+    )
@@ -0,0 +1,236 @@
+"""Opt-in end-to-end latency of the edits made in ``ColorOpacityEditor``.
+
+With ``instrument=True`` the editor stamps every batch of node edits, the stamp
+travels with the v-model update. The server acknowledges the stamp once its
+handlers are done, and the editor reports back the timings it observed. Each
+edit is broken into milestones, in milliseconds since the edit:
+
+- ``emit``: the editor sent the update (includes the coalescing of ``update_policy``)
+- ``receipt``: the server received it, estimated as half the round trip not spent on the
+  server, the clocks of the browser and the server being unrelated
+- ``handler``: the server handlers are done
+- ``ack``: the acknowledgement, sent once the handlers are done, reached the editor
+- ``render``: the server started rendering the view, see ``observe_render``
+- ``rendered``: the server finished rendering the view
+- ``frame``: the rendered image reached the browser
+
+A ``VtkRemoteView`` publishes its image right after rendering it, the render is
+acknowledged again once it is published. Both travel over the same websocket, so the
+image has reached the browser when the editor receives that acknowledgement. When the
+render happens within the handlers (``view.update()`` in ``measure``), the first
+acknowledgement already follows the image and ``frame`` equals ``ack``.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+__all__ = [
+    "LatencyMetrics",
+]
+
+
+class LatencyMetrics:
+    """Collect the latency reports of an instrumented editor.
+
+    Args:
+        maxlen: Number of edits kept, the oldest are dropped.
+    """
+
+    STAGES = ("emit", "receipt", "handler", "ack", "render", "rendered", "frame")
+
+    def __init__(self, maxlen: int = 1000):
+        self._records = deque(maxlen=maxlen)
+        # Records still waiting for their render milestones, by stamp id
+        self._unrendered = {}
+        self._lock = threading.Lock()
+        self._state = None
+        self._stamp_name = None
+        self._ack_name = None
+        self._stamp_id = None
+        self._received = 0.0
+        self._handler_time = 0.0
+        self._measuring = 0
+        self._render_start = 0.0
+        self._render = None
+        self._rendered_id = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def bind(self, state, stamp: str = "latency_stamp", ack: str = "latency_ack"):
+        """Use ``state[stamp]`` / ``state[ack]`` to exchange the stamps with the editor."""
+        self._state = state
+        self._stamp_name = stamp
+        self._ack_name = ack
+        state.setdefault(stamp, None)
+        state.setdefault(ack, None)
+
+    def editor_kwargs(self) -> dict:
+        """Keyword arguments instrumenting a ``ColorOpacityEditor``, see ``bind``."""
+        return {
+            "instrument": True,
+            "v_model_latencyStamp": (self._stamp_name,),
+            "latency_ack": (self._ack_name,),
+            "latency": (self.record, "[$event]"),
+        }
+
+    def observe_render(self, render_window):
+        """Time the renders of ``render_window``, e.g. the one shown by a ``VtkRemoteView``.
+
+        The first render ending after a stamp was received is attributed to it.
+        """
+        render_window.AddObserver("StartEvent", self._on_render_start)
+        render_window.AddObserver("EndEvent", self._on_render_end)
+
+    @contextmanager
+    def measure(self):
+        """Wrap the handlers of the editor updates, e.g. ``@change("opacities")``.
+
+        The time spent in the handlers is attributed to the latest stamp received,
+        which is acknowledged when the handler exits.
+        """
+        start = time.perf_counter()
+        stamp = self._state[self._stamp_name] if self._state is not None else None
+
+        if stamp is not None and stamp["id"] != self._stamp_id:
+            self._stamp_id = stamp["id"]
+            self._received = start
+            self._handler_time = 0.0
+            self._render = None
+
+        self._measuring += 1
+
+        try:
+            yield
+        finally:
+            self._measuring -= 1
+
+            if stamp is not None:
+                self._handler_time += time.perf_counter() - start
+                self._state[self._ack_name] = self._ack()
+
+    def _ack(self) -> dict:
+        ack = {
+            "id": self._stamp_id,
+            "server": (time.perf_counter() - self._received) * 1e3,
+            "handler": self._handler_time * 1e3,
+        }
+
+        if self._render is not None:
+            ack.update(self._render)
+
+        return ack
+
+    def _on_render_start(self, *_):
+        self._render_start = time.perf_counter()
+
+    def _on_render_end(self, *_):
+        if self._stamp_id is None or self._rendered_id == self._stamp_id:
+            return
+
+        end = time.perf_counter()
+        self._rendered_id = self._stamp_id
+        self._render = {
+            "render": (self._render_start - self._received) * 1e3,
+            "rendered": (end - self._received) * 1e3,
+        }
+
+        # Within the handlers, the acknowledgement sent when they exit carries the render
+        if self._measuring:
+            return
+
+        # Otherwise acknowledge it once the image, published after the render, is sent
+        try:
+            asyncio.get_running_loop().call_soon(self._acknowledge_render, self._stamp_id)
+        except RuntimeError:
+            self._acknowledge_render(self._stamp_id)
+
+    def _acknowledge_render(self, stamp_id):
+        # A newer stamp is acknowledged by its own handlers
+        if stamp_id != self._stamp_id:
+            return
+
+        with self._state:
+            self._state[self._ack_name] = self._ack()
+
+    def record(self, report: dict):
+        """Record the report sent by the editor, bound to its ``latency`` event.
+
+        Args:
+            report: ``{"id", "emit": ms, "roundtrip": ms, "server": ms, "handler": ms}`` with
+                ``roundtrip`` from the update being sent to the acknowledgement received. Once
+                the render is acknowledged, ``{"id", "frame": ms, "render": ms, "rendered": ms}``
+                with ``frame`` from the update being sent to that acknowledgement received, and
+                ``render`` / ``rendered`` from the receipt to the start / end of the render. A
+                render acknowledged along with the handlers comes in a single report with all
+                the keys.
+        """
+        with self._lock:
+            if "roundtrip" in report:
+                emit = report["emit"]
+                roundtrip = report["roundtrip"]
+                server = min(report["server"], roundtrip)
+                receipt = emit + (roundtrip - server) / 2
+                record = [emit, receipt, receipt + report["handler"], emit + roundtrip]
+                record += [np.nan] * 3
+                self._records.append(record)
+
+                if "frame" not in report:
+                    self._unrendered[report.get("id")] = record
+
+                    # Renders never observed leave their records behind
+                    while len(self._unrendered) > self._records.maxlen:
+                        del self._unrendered[next(iter(self._unrendered))]
+            else:
+                record = self._unrendered.get(report.get("id"))
+
+            if record is not None and "frame" in report:
+                self._unrendered.pop(report.get("id"), None)
+                record[4] = record[1] + report["render"]
+                record[5] = record[1] + report["rendered"]
+                record[6] = record[0] + report["frame"]
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+            self._unrendered.clear()
+
+    def percentiles(self, stage: str, q=(50, 90, 99)) -> dict[str, float]:
+        """Percentiles of the milliseconds from the edit to ``stage``.
+
+        The edits that did not reach ``stage``, e.g. no render observed, are left out.
+        """
+        values = self._values(stage)
+
+        if len(values) == 0:
+            return {f"p{p}": float("nan") for p in q}
+
+        return {f"p{p}": float(v) for p, v in zip(q, np.percentile(values, q))}
+
+    def summary(self, q=(50, 90, 99)) -> dict[str, dict[str, float]]:
+        """``{stage: {"count", "mean", "p50", ...}}``, e.g. to expose to a metrics scraper."""
+        summary = {}
+
+        for stage in self.STAGES:
+            values = self._values(stage)
+            summary[stage] = {
+                "count": len(values),
+                "mean": float(values.mean()) if len(values) else float("nan"),
+                **self.percentiles(stage, q),
+            }
+
+        return summary
+
+    def _values(self, stage: str) -> np.ndarray:
+        column = self.STAGES.index(stage)
+
+        with self._lock:
+            records = list(self._records)
+
+        values = np.array([record[column] for record in records], dtype=np.float64)
+        return values[~np.isnan(values)]
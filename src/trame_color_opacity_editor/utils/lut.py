@@ -0,0 +1,88 @@
+"""Dense RGBA lookup tables baked from the editor nodes.
+
+The interpolation matches the one of the editor (``createColorMap`` /
+``createOpacityMap`` from ``@colormap/core``): linear in RGB and opacity
+between nodes, clamped to the first and last node outside of them.
+"""
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.cache import LRUCache, content_hash
+from trame_color_opacity_editor.utils.nodes import color_nodes_to_array, opacity_nodes_to_array
+
+__all__ = [
+    "bake_lut",
+    "lut_cache",
+]
+
+# Baked tables keyed by a hash of the nodes and of the sampling parameters
+lut_cache = LRUCache(maxsize=64)
+
+
+def _nodes_range(*arrays) -> list[float]:
+    xs = [array[:, 0] for array in arrays if len(array)]
+
+    if not xs:
+        return [0.0, 1.0]
+
+    return [float(min(x.min() for x in xs)), float(max(x.max() for x in xs))]
+
+
+def _interpolate(x: np.ndarray, nodes: np.ndarray, default: float) -> np.ndarray:
+    columns = nodes.shape[1] - 1
+
+    if len(nodes) == 0:
+        return np.full((len(x), columns), default)
+
+    return np.column_stack([np.interp(x, nodes[:, 0], nodes[:, i + 1]) for i in range(columns)])
+
+
+def bake_lut(
+    color_nodes=None,
+    opacity_nodes=None,
+    size: int = 256,
+    scalar_range=None,
+    dtype=np.float64,
+    cache: bool = True,
+) -> np.ndarray:
+    """Sample the color and opacity nodes into a ``(size, 4)`` RGBA table.
+
+    Args:
+        color_nodes: The ``colorNodes`` of the editor (list, array or packed), white if omitted.
+        opacity_nodes: The ``opacityNodes`` of the editor, opaque if omitted.
+        size: Number of entries of the table.
+        scalar_range: ``[min, max]`` sampled by the table, defaults to the range of the nodes.
+        dtype: ``np.float64``/``np.float32`` give values in ``[0, 1]``, ``np.uint8`` in ``[0, 255]``.
+        cache: Look the table up in, and store it into, ``lut_cache``.
+
+    Returns:
+        A read-only array when cached, shared between identical bakes.
+    """
+    colors = color_nodes_to_array([] if color_nodes is None else color_nodes)
+    opacities = opacity_nodes_to_array([] if opacity_nodes is None else opacity_nodes)
+
+    if scalar_range is None:
+        scalar_range = _nodes_range(colors, opacities)
+
+    dtype = np.dtype(dtype)
+    key = None
+
+    if cache:
+        key = content_hash(colors, opacities, size, *map(float, scalar_range), dtype.str)
+        lut = lut_cache.get(key)
+        if lut is not None:
+            return lut
+
+    x = np.linspace(scalar_range[0], scalar_range[1], size)
+    lut = np.column_stack((_interpolate(x, colors, 1.0), _interpolate(x, opacities, 1.0)))
+
+    if dtype.kind == "u":
+        lut = np.rint(np.clip(lut, 0, 1) * 255)
+
+    lut = lut.astype(dtype)
+
+    if cache:
+        lut.flags.writeable = False
+        lut_cache.put(key, lut)
+
+    return lut
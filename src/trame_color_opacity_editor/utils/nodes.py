@@ -0,0 +1,141 @@
+from itertools import chain
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.packing import is_packed, unpack_array
+from trame_color_opacity_editor.utils.store import get_stored_array, is_stored
+
+__all__ = [
+    "opacity_nodes_to_array",
+    "color_nodes_to_array",
+    "merge_nodes",
+    "simplify_nodes",
+]
+
+
+def opacity_nodes_to_array(nodes) -> np.ndarray:
+    """Convert opacity nodes ``[[x, opacity], ...]`` to a ``(N, 2)`` float64 array."""
+    if is_packed(nodes):
+        nodes = unpack_array(nodes)
+    elif is_stored(nodes):
+        nodes = get_stored_array(nodes)
+
+    return np.asarray(nodes, dtype=np.float64).reshape(-1, 2)
+
+
+def color_nodes_to_array(nodes) -> np.ndarray:
+    """Convert color nodes ``[[x, [r, g, b]], ...]`` to a ``(N, 4)`` float64 array.
+
+    Arrays that are already flat (``[[x, r, g, b], ...]``), packed, stored or not, are passed
+    through.
+    """
+    if is_packed(nodes):
+        nodes = unpack_array(nodes)
+    elif is_stored(nodes):
+        nodes = get_stored_array(nodes)
+
+    if isinstance(nodes, np.ndarray):
+        return np.asarray(nodes, dtype=np.float64).reshape(-1, 4)
+
+    flat = chain.from_iterable((node[0], *node[1]) for node in nodes)
+    return np.fromiter(flat, dtype=np.float64, count=4 * len(nodes)).reshape(-1, 4)
+
+
+def _values_at(nodes: np.ndarray, k: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # Values of the sorted ``nodes`` at ``x``, ``k`` being the index of the first node
+    # not below ``x``: clamped outside of the nodes, the later node wins on equal ``x``
+    upper = nodes[np.minimum(k, len(nodes) - 1)]
+    lower = nodes[np.maximum(k - 1, 0)]
+    span = upper[:, 0] - lower[:, 0]
+    t = np.ones(len(x))
+    np.divide(x - lower[:, 0], span, out=t, where=span > 0)
+    return lower[:, 1:] + t[:, np.newaxis] * (upper[:, 1:] - lower[:, 1:])
+
+
+def merge_nodes(color_nodes, opacity_nodes) -> np.ndarray:
+    """Merge sorted color and opacity nodes into ``(N, 5)`` ``[x, r, g, b, opacity]`` rows.
+
+    Vectorized equivalent of ``mergeNodes`` of the editor, giving the same rows: one
+    for each node of either list, a color node and an opacity node at the same ``x``
+    sharing a row. Each list is interpolated linearly, and clamped, at the ``x`` of the
+    other. Nodes repeated at the same ``x`` within a list each keep their own row.
+    """
+    colors = color_nodes_to_array(color_nodes)
+    opacities = opacity_nodes_to_array(opacity_nodes)
+
+    if len(colors) == 0 or len(opacities) == 0:
+        return np.empty((0, 5))
+
+    distinct = np.union1d(colors[:, 0], opacities[:, 0])
+    color_first = np.searchsorted(colors[:, 0], distinct, side="left")
+    color_count = np.searchsorted(colors[:, 0], distinct, side="right") - color_first
+    opacity_first = np.searchsorted(opacities[:, 0], distinct, side="left")
+    opacity_count = np.searchsorted(opacities[:, 0], distinct, side="right") - opacity_first
+
+    # The walk pairs the nodes of both lists at the same x, the extra ones get their own rows
+    rows = np.maximum(color_count, opacity_count)
+    x = np.repeat(distinct, rows)
+    repeat = np.arange(len(x)) - np.repeat(np.cumsum(rows) - rows, rows)
+
+    color_index = np.repeat(color_first, rows) + np.minimum(repeat, np.repeat(color_count, rows))
+    opacity_index = np.repeat(opacity_first, rows) + np.minimum(
+        repeat, np.repeat(opacity_count, rows)
+    )
+
+    return np.column_stack(
+        (x, _values_at(colors, color_index, x), _values_at(opacities, opacity_index, x))
+    )
+
+
+def _interpolation_errors(first: np.ndarray, last: np.ndarray, inner: np.ndarray) -> np.ndarray:
+    # Largest difference, over the values, between the inner nodes and the line first -> last
+    span = last[0] - first[0]
+    t = (inner[:, 0] - first[0]) / span if span > 0 else np.zeros(len(inner))
+    line = first[1:] + t[:, np.newaxis] * (last[1:] - first[1:])
+    return np.abs(inner[:, 1:] - line).max(axis=1)
+
+
+def simplify_nodes(nodes, tolerance: float = 1e-3) -> tuple[np.ndarray, float]:
+    """Remove the nodes that interpolating between their neighbors reproduces within ``tolerance``.
+
+    Douglas-Peucker over the values, e.g. opacity or each of r, g, b: the
+    distance of a node to a segment is measured along the values, not across
+    the segment. The first and last nodes are always kept.
+
+    Both node lists are piecewise linear, so the error at the removed nodes is
+    the largest interpolation error over the whole scalar range.
+
+    Args:
+        nodes: ``(N, 1 + C)`` sorted ``[x, *values]`` rows.
+        tolerance: Largest interpolation error allowed on any value.
+
+    Returns:
+        The kept nodes, and the largest interpolation error of any value.
+    """
+    nodes = np.asarray(nodes, dtype=np.float64)
+
+    if len(nodes) <= 2:
+        return nodes.copy(), 0.0
+
+    keep = np.zeros(len(nodes), dtype=bool)
+    keep[[0, -1]] = True
+    error = 0.0
+    segments = [(0, len(nodes) - 1)]
+
+    while segments:
+        first, last = segments.pop()
+
+        if last - first < 2:
+            continue
+
+        errors = _interpolation_errors(nodes[first], nodes[last], nodes[first + 1 : last])
+        farthest = int(np.argmax(errors))
+
+        if errors[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            segments += [(first, split), (split, last)]
+        else:
+            error = max(error, float(errors[farthest]))
+
+    return nodes[keep], error
@@ -0,0 +1,42 @@
+"""Compact binary transport of node lists and histograms.
+
+A ``(N, C)`` array is sent to the client as packed little-endian float32 values
+(``{"dtype": "float32", "shape": [N, C], "buffer": bytes}``) instead of a nested
+list of numbers. The editor decodes it back into nodes, where ``C == 2`` gives
+``[[x, y], ...]`` (opacity nodes, histograms) and ``C == 4`` gives
+``[[x, [r, g, b]], ...]`` (color nodes). When a node model is received packed,
+the editor sends its updates back packed as well.
+"""
+
+import numpy as np
+
+__all__ = [
+    "pack_array",
+    "unpack_array",
+    "is_packed",
+]
+
+_DTYPE = np.dtype("<f4")
+
+
+def pack_array(array) -> dict:
+    """Pack a ``(N, C)`` array of numbers into a dict that can be set in the state."""
+    array = np.asarray(array)
+
+    if array.ndim == 1:
+        array = array.reshape(-1, 1)
+
+    return {
+        "dtype": "float32",
+        "shape": list(array.shape),
+        "buffer": np.ascontiguousarray(array, dtype=_DTYPE).tobytes(),
+    }
+
+
+def unpack_array(packed: dict) -> np.ndarray:
+    """Decode a packed array, as produced by :func:`pack_array` or sent by the editor."""
+    return np.frombuffer(packed["buffer"], dtype=_DTYPE).reshape(packed["shape"])
+
+
+def is_packed(value) -> bool:
+    return isinstance(value, dict) and "buffer" in value and "shape" in value
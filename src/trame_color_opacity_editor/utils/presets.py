@@ -0,0 +1,258 @@
+"""Colormap presets stored in a single compact, indexed file.
+
+File layout::
+
+    b"COEP" | version (u32) | index size (u32) | index (utf-8 JSON) | nodes (float32)
+
+The index maps each preset name to the offset and count of its color nodes
+(``[x, r, g, b]`` rows) and, optionally, of its opacity nodes (``[x, opacity]``
+rows), with ``x`` normalized to ``[0, 1]``. Listing the presets only reads the
+index, the nodes of a preset are read and decoded the first time it is used.
+
+A preset file can be built from a ParaView ``ColorMaps.json`` export with::
+
+    python -m trame_color_opacity_editor.utils.presets ColorMaps.json presets.bin
+"""
+
+import hashlib
+import json
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.cache import LRUCache
+from trame_color_opacity_editor.utils.nodes import simplify_nodes
+
+__all__ = [
+    "DEFAULT_PRESETS_PATH",
+    "PresetLibrary",
+    "read_paraview_presets",
+    "write_presets",
+    "get_presets",
+]
+
+DEFAULT_PRESETS_PATH = Path(__file__).parent.parent / "data" / "presets.bin"
+
+_MAGIC = b"COEP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_DTYPE = np.dtype("<f4")
+
+
+def _normalized(nodes: np.ndarray) -> np.ndarray:
+    nodes = np.asarray(nodes, dtype=np.float64).copy()
+    nodes = nodes[np.argsort(nodes[:, 0], kind="stable")]
+    start, end = nodes[0, 0], nodes[-1, 0]
+    nodes[:, 0] = (nodes[:, 0] - start) / (end - start) if end > start else 0.0
+    return nodes
+
+
+def write_presets(path, presets: dict):
+    """Write presets to a preset file.
+
+    Args:
+        path: Destination file.
+        presets: ``{name: {"color": (N, 4) nodes, "opacity": (M, 2) nodes or None}}``,
+            the nodes are normalized to ``[0, 1]`` on write.
+    """
+    index = {}
+    chunks = []
+    offset = 0
+
+    for name, preset in presets.items():
+        entry = {}
+
+        for kind in ("color", "opacity"):
+            nodes = preset.get(kind)
+            if nodes is None or len(nodes) == 0:
+                continue
+
+            data = _normalized(nodes).astype(_DTYPE)
+            entry[kind] = [offset, len(data)]
+            chunks.append(data.tobytes())
+            offset += data.nbytes
+
+        index[name] = entry
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def read_paraview_presets(path, tolerance: float | None = None) -> dict:
+    """Read the presets of a ParaView ``ColorMaps.json`` in the format of ``write_presets``.
+
+    Only ``RGBPoints`` and ``Points`` are used, the nodes are interpolated in RGB
+    by the editor whatever the ``ColorSpace`` of the preset.
+
+    Args:
+        path: The ``ColorMaps.json`` file.
+        tolerance: Simplify the nodes of every preset with ``simplify_nodes``, the
+            largest interpolation error is stored in ``preset["error"]``.
+    """
+    with open(path) as f:
+        entries = json.load(f)
+
+    presets = {}
+
+    for entry in entries:
+        if "Name" not in entry or "RGBPoints" not in entry:
+            continue
+
+        preset = {"color": np.reshape(entry["RGBPoints"], (-1, 4))}
+
+        if "Points" in entry:
+            # ParaView stores [x, opacity, midpoint, sharpness]
+            preset["opacity"] = np.reshape(entry["Points"], (-1, 4))[:, :2]
+
+        if tolerance is not None:
+            preset["error"] = 0.0
+            for kind in ("color", "opacity"):
+                if kind in preset and len(preset[kind]):
+                    nodes = preset[kind][np.argsort(preset[kind][:, 0], kind="stable")]
+                    preset[kind], error = simplify_nodes(nodes, tolerance)
+                    preset["error"] = max(preset["error"], error)
+
+        presets[entry["Name"]] = preset
+
+    return presets
+
+
+class PresetLibrary:
+    """Lazy access to the presets of a preset file.
+
+    Args:
+        path: The preset file, defaults to the presets shipped with the package.
+        cache_size: Number of decoded presets kept in memory.
+    """
+
+    def __init__(self, path=DEFAULT_PRESETS_PATH, cache_size: int = 16):
+        self.path = Path(path)
+        self._cache = LRUCache(maxsize=cache_size)
+        self._digest = None
+
+        with open(self.path, "rb") as f:
+            magic, version, index_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{self.path} is not a preset file")
+
+            self._index = json.loads(f.read(index_size))
+            self._data_offset = _HEADER.size + index_size
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def names(self) -> list[str]:
+        return list(self._index)
+
+    def digest(self) -> str:
+        """Hash of the content of the preset file, e.g. to key derived data."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self.path.read_bytes(), digest_size=16).hexdigest()
+
+        return self._digest
+
+    def _read(self, name: str, kind: str) -> np.ndarray | None:
+        key = (name, kind)
+        nodes = self._cache.get(key)
+
+        if nodes is None:
+            location = self._index[name].get(kind)
+            if location is None:
+                return None
+
+            offset, count = location
+            columns = 4 if kind == "color" else 2
+            nodes = np.fromfile(
+                self.path,
+                dtype=_DTYPE,
+                count=count * columns,
+                offset=self._data_offset + offset,
+            ).reshape(count, columns)
+            nodes.flags.writeable = False
+            self._cache.put(key, nodes)
+
+        return nodes
+
+    @staticmethod
+    def _unnormalized(nodes: np.ndarray, scalar_range) -> np.ndarray:
+        nodes = nodes.astype(np.float64)
+        if scalar_range is not None:
+            nodes[:, 0] = scalar_range[0] + nodes[:, 0] * (scalar_range[1] - scalar_range[0])
+        return nodes
+
+    def color_nodes(self, name: str, scalar_range=None, as_array: bool = False):
+        """The color nodes of a preset, spread over ``scalar_range`` (``[0, 1]`` by default).
+
+        Returns:
+            ``[[x, [r, g, b]], ...]``, or a ``(N, 4)`` array with ``as_array=True``.
+        """
+        nodes = self._unnormalized(self._read(name, "color"), scalar_range)
+
+        if as_array:
+            return nodes
+
+        return [[row[0], row[1:]] for row in nodes.tolist()]
+
+    def opacity_nodes(self, name: str, scalar_range=None, as_array: bool = False):
+        """The opacity nodes of a preset, ``None`` if it has none."""
+        nodes = self._read(name, "opacity")
+
+        if nodes is None:
+            return None
+
+        nodes = self._unnormalized(nodes, scalar_range)
+
+        return nodes if as_array else nodes.tolist()
+
+
+_default_library = None
+_default_library_lock = threading.Lock()
+
+
+def get_presets() -> PresetLibrary:
+    """The library of the presets shipped with the package, opened on first use."""
+    global _default_library
+
+    with _default_library_lock:
+        if _default_library is None:
+            _default_library = PresetLibrary()
+
+    return _default_library
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a preset file from ParaView presets.")
+    parser.add_argument("input", help="ParaView ColorMaps.json")
+    parser.add_argument("output", help="Preset file to write")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help="Simplify the nodes, within this interpolation error (e.g. 1e-3)",
+    )
+    args = parser.parse_args()
+
+    presets = read_paraview_presets(args.input, args.tolerance)
+    write_presets(args.output, presets)
+    print(f"Wrote {len(presets)} presets to {args.output}")
+
+    if args.tolerance is not None and presets:
+        nodes = sum(len(p["color"]) + len(p.get("opacity", [])) for p in presets.values())
+        error = max(p["error"] for p in presets.values())
+        print(f"{nodes} nodes after simplification, largest error {error:.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Read arrays in slabs along their first axis, across a thread pool.
+
+Internal machinery of the histogram passes (``utils.histograms``,
+``utils.joint_histogram``), which never hold more than a few slabs in memory.
+Anything that can be sliced along its first axis works: ``np.ndarray``,
+``np.memmap``, h5py or zarr datasets, ...
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "slabs",
+    "read_slab",
+    "reduce_slabs",
+]
+
+DEFAULT_CHUNK_SIZE = 1 << 24
+
+
+def slabs(data, chunk_size: int) -> list[slice]:
+    """Slices of whole rows along the first axis, of about ``chunk_size`` values each."""
+    if len(data.shape) == 0:
+        return [slice(0, 1)]
+
+    row_size = max(int(np.prod(data.shape[1:])), 1)
+    rows = max(chunk_size // row_size, 1)
+    return [slice(start, start + rows) for start in range(0, data.shape[0], rows)]
+
+
+def read_slab(data, slab: slice) -> np.ndarray:
+    """The values of a slab, flattened."""
+    if len(data.shape) == 0:
+        return np.asarray(data).reshape(1)
+
+    return np.asarray(data[slab]).reshape(-1)
+
+
+def reduce_slabs(fn, combine, initial, data, chunk_size: int, max_workers: int | None):
+    """Fold ``fn(slab)`` of every slab into ``initial`` with ``combine(result, value)``.
+
+    Results are combined as they complete, in any order, and at most two slabs per
+    worker are in flight, so only that many partial results are held at once.
+
+    Args:
+        fn: Called with each slice returned by ``slabs``, from the worker threads.
+        combine: Returns the accumulated result, may update it in place.
+        max_workers: Size of the thread pool, ``1`` disables threading.
+    """
+    slices = slabs(data, chunk_size)
+    result = initial
+
+    if len(slices) == 1 or max_workers == 1:
+        for slab in slices:
+            result = combine(result, fn(slab))
+        return result
+
+    # Same default as ThreadPoolExecutor
+    limit = 2 * (max_workers or min(32, (os.cpu_count() or 1) + 4))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+
+        for slab in slices:
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = combine(result, future.result())
+
+            pending.add(executor.submit(fn, slab))
+
+        for future in pending:
+            result = combine(result, future.result())
+
+    return result
@@ -0,0 +1,213 @@
+"""Process-wide, content-addressed store of the immutable inputs of the editor.
+
+Histograms, preset nodes or baked lookup tables that are the same for every
+session are written once, under the hash of their content, and served as static
+files. The state of a session only holds a small reference to them::
+
+    {
+        "dtype": "float32",
+        "shape": [N, C],
+        "url": "__trame_color_opacity_editor_store/<hash>",
+        "store": 1,
+    }
+
+The editor fetches a reference the first time it sees it and keeps the result
+for every editor of the page, the browser caches the file across page loads.
+The store lives in a directory, so processes sharing the directory (one per
+session behind a launcher) share the files too.
+"""
+
+import hashlib
+import itertools
+import os
+import re
+import threading
+import weakref
+from pathlib import Path
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.cache import DEFAULT_CACHE_DIR
+from trame_color_opacity_editor.utils.packing import is_packed, pack_array
+
+__all__ = [
+    "DEFAULT_STORE_DIR",
+    "ContentStore",
+    "get_content_store",
+    "get_stored_array",
+    "is_stored",
+]
+
+DEFAULT_STORE_DIR = DEFAULT_CACHE_DIR / "store"
+
+_DTYPE = np.dtype("<f4")
+
+# Keys are the hex digests of ``put``, anything else (e.g. from a client) is not a file name
+_KEY = re.compile(r"[0-9a-f]{32}")
+
+# Stores by id, the ``store`` of their references
+_stores = weakref.WeakValueDictionary()
+_store_ids = itertools.count(1)
+
+
+def is_stored(value) -> bool:
+    """Whether ``value`` is a reference to an array of a ``ContentStore``."""
+    return isinstance(value, dict) and "url" in value and "shape" in value
+
+
+class ContentStore:
+    """Immutable blobs written once under the hash of their content.
+
+    Args:
+        directory: Where the blobs are written.
+        name: Path under which the blobs are served by ``serve``, the stores served by the
+            same server need their own.
+    """
+
+    def __init__(
+        self,
+        directory=DEFAULT_STORE_DIR,
+        name: str = "__trame_color_opacity_editor_store",
+    ):
+        self.directory = Path(directory)
+        self.name = name
+        self._served = set()
+        self._lock = threading.Lock()
+        # Identifies the store when resolving its references, see ``get_stored_array``
+        self.id = next(_store_ids)
+        _stores[self.id] = self
+
+    def __contains__(self, key: str) -> bool:
+        return _KEY.fullmatch(key) is not None and self.path(key).exists()
+
+    def path(self, key: str) -> Path:
+        """The file of ``key``.
+
+        Raises:
+            ValueError: When ``key`` is not a key returned by ``put``.
+        """
+        if _KEY.fullmatch(key) is None:
+            raise ValueError(f"Invalid content key: {key!r}")
+
+        return self.directory / key
+
+    def url(self, key: str) -> str:
+        return f"{self.name}/{key}"
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` unless already stored, returns its key.
+
+        The file is checked for on every call: another process sharing the directory may have
+        pruned it. When already stored, its modification time is updated so that ``prune``
+        keeps it.
+        """
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+        with self._lock:
+            path = self.path(key)
+
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write then rename so concurrent processes never read a partial file
+                partial = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.partial")
+                partial.write_bytes(data)
+                partial.replace(path)
+
+        return key
+
+    def get(self, key: str) -> bytes | None:
+        """The data stored under ``key``, ``None`` when missing or not a key."""
+        if _KEY.fullmatch(key) is None:
+            return None
+
+        try:
+            return self.path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put_array(self, array) -> dict:
+        """Store a ``(N, C)`` array as float32 values, returns its reference for the state.
+
+        Args:
+            array: An array, or an array packed by ``utils.packing.pack_array``.
+        """
+        packed = array if is_packed(array) else pack_array(array)
+        key = self.put(bytes(packed["buffer"]))
+        return {
+            "dtype": "float32",
+            "shape": list(packed["shape"]),
+            "url": self.url(key),
+            "store": self.id,
+        }
+
+    def get_array(self, reference: dict) -> np.ndarray:
+        """The array of a reference returned by ``put_array``."""
+        key = reference["url"].rsplit("/", 1)[-1]
+        data = self.get(key)
+
+        if data is None:
+            raise KeyError(key)
+
+        return np.frombuffer(data, dtype=_DTYPE).reshape(reference["shape"])
+
+    def serve(self, server):
+        """Serve the store from ``server``, before it starts. Calling it again is a no-op."""
+        if id(server) in self._served:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        server.enable_module({"serve": {self.name: str(self.directory)}})
+        self._served.add(id(server))
+
+    def prune(self, max_bytes: int) -> int:
+        """Delete the least recently modified blobs until the store fits ``max_bytes``.
+
+        Returns:
+            The number of bytes freed.
+        """
+        if not self.directory.exists():
+            return 0
+
+        files = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry)
+            for entry in self.directory.iterdir()
+            if entry.is_file() and not entry.name.endswith(".partial")
+        )
+        total = sum(size for _, size, _ in files)
+        freed = 0
+
+        for _, size, entry in files:
+            if total - freed <= max_bytes:
+                break
+
+            entry.unlink(missing_ok=True)
+            freed += size
+
+        return freed
+
+
+def get_stored_array(reference: dict) -> np.ndarray:
+    """The array of a reference returned by ``put_array`` of any store of the process."""
+    store = _stores.get(reference.get("store"))
+
+    if store is None:
+        store = get_content_store()
+
+    return store.get_array(reference)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_content_store() -> ContentStore:
+    """The store shared by all the sessions of the process."""
+    global _default_store
+
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ContentStore()
+
+    return _default_store
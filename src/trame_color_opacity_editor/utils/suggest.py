@@ -0,0 +1,266 @@
+"""Starting transfer functions suggested from the histogram of the data.
+
+All the methods work on the bins of a histogram that was already computed,
+never on the data, so they run in milliseconds whatever the size of the volume.
+"""
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.histograms import Histogram, MultiResolutionHistogram
+from trame_color_opacity_editor.utils.presets import get_presets
+from trame_color_opacity_editor.utils.transfer_function import (
+    ColorTransferFunction,
+    OpacityTransferFunction,
+)
+
+__all__ = [
+    "SUGGESTION_METHODS",
+    "histogram_percentiles",
+    "otsu_threshold",
+    "find_peaks",
+    "suggest_transfer_function",
+]
+
+SUGGESTION_METHODS = ["percentiles", "otsu", "peaks"]
+
+
+def _as_histogram(histogram, bins: int) -> Histogram:
+    if isinstance(histogram, Histogram) and len(histogram.counts) > bins:
+        histogram = MultiResolutionHistogram(histogram)
+
+    if isinstance(histogram, MultiResolutionHistogram):
+        return histogram.rebin(bins=bins)
+
+    return histogram
+
+
+def histogram_percentiles(histogram: Histogram, q) -> np.ndarray:
+    """Percentiles of the data, interpolated from the cumulative counts of the histogram."""
+    cumulative = np.concatenate(([0.0], np.cumsum(histogram.counts, dtype=np.float64)))
+
+    if cumulative[-1] <= 0:
+        return np.interp(np.asarray(q) / 100, [0, 1], histogram.scalar_range)
+
+    counts = np.diff(cumulative)
+    targets = np.asarray(q, dtype=np.float64) / 100 * cumulative[-1]
+
+    # The bin with cumulative[i] <= target < cumulative[i + 1], never an empty bin: targets
+    # between two non-empty bins go to the start of the next one, not within the gap
+    i = np.searchsorted(cumulative, targets, side="right") - 1
+    i = np.clip(i, 0, np.flatnonzero(counts)[-1])
+    fraction = (targets - cumulative[i]) / counts[i]
+
+    edges = histogram.edges
+    return edges[i] + fraction * (edges[i + 1] - edges[i])
+
+
+def otsu_threshold(histogram: Histogram) -> float:
+    """The threshold maximizing the between-class variance of the values (Otsu's method)."""
+    counts = histogram.counts.astype(np.float64)
+    centers = (histogram.edges[:-1] + histogram.edges[1:]) / 2
+
+    weight_below = np.cumsum(counts)[:-1]
+    weight_above = counts.sum() - weight_below
+    sum_below = np.cumsum(counts * centers)[:-1]
+    sum_above = (counts * centers).sum() - sum_below
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (
+            weight_below * weight_above * (sum_below / weight_below - sum_above / weight_above) ** 2
+        )
+
+    between = np.nan_to_num(between, nan=-1.0)
+
+    if len(between) == 0 or between.max() < 0:
+        return float(np.mean(histogram.scalar_range))
+
+    # The threshold is the upper edge of the last bin of the lower class
+    return float(histogram.edges[int(np.argmax(between)) + 1])
+
+
+def _smooth(values: np.ndarray, width: int) -> np.ndarray:
+    if width <= 1:
+        return values
+
+    kernel = np.ones(width) / width
+    return np.convolve(np.pad(values, width // 2, mode="edge"), kernel, mode="valid")[: len(values)]
+
+
+def _prominence(values: np.ndarray, index: int) -> float:
+    # Height above the highest of the two lowest points separating the peak from higher ground
+    higher = values > values[index]
+    left = np.flatnonzero(higher[:index])
+    right = np.flatnonzero(higher[index + 1 :])
+    start = left[-1] + 1 if len(left) else 0
+    end = index + 1 + right[0] if len(right) else len(values)
+    base = max(values[start : index + 1].min(), values[index:end].min())
+    return float(values[index] - base)
+
+
+def find_peaks(
+    histogram: Histogram,
+    count: int = 3,
+    min_distance: float = 0.05,
+    min_prominence: float = 0.1,
+    smoothing: float = 0.01,
+) -> list[tuple[float, float, float]]:
+    """The most prominent peaks of the (log) histogram.
+
+    Bins with less than a thousandth of the highest count are considered noise.
+
+    Args:
+        count: Maximum number of peaks.
+        min_distance: Minimum distance between peaks, as a fraction of the range.
+        min_prominence: Minimum prominence of a peak, as a fraction of the highest one.
+        smoothing: Width of the box filter applied first, as a fraction of the bins.
+
+    Returns:
+        ``[(center, left, right), ...]`` sorted by center, ``left`` and ``right`` being
+        where the peak falls below half its prominence.
+    """
+    counts = histogram.counts.astype(np.float64)
+    noise = max(counts.max(initial=0) * 1e-3, 1)
+    values = _smooth(np.log1p(counts / noise), max(int(len(counts) * smoothing), 1))
+    centers = (histogram.edges[:-1] + histogram.edges[1:]) / 2
+
+    if len(values) < 3:
+        return []
+
+    inner = values[1:-1]
+    threshold = min_prominence * values.max()
+    candidates = np.flatnonzero((inner > values[:-2]) & (inner >= values[2:]) & (inner > threshold))
+    candidates += 1
+    prominences = np.array([_prominence(values, index) for index in candidates])
+    order = np.argsort(prominences)[::-1]
+
+    span = histogram.scalar_range[1] - histogram.scalar_range[0]
+    selected = []
+
+    for index, prominence in zip(candidates[order], prominences[order]):
+        if prominence <= threshold:
+            break
+
+        if all(
+            abs(centers[index] - centers[other]) >= min_distance * span for other, _ in selected
+        ):
+            selected.append((index, prominence))
+            if len(selected) == count:
+                break
+
+    peaks = []
+
+    for index, prominence in sorted(selected):
+        below = values < values[index] - prominence / 2
+        left = np.flatnonzero(below[:index])
+        right = np.flatnonzero(below[index:])
+        left = centers[left[-1]] if len(left) else centers[0]
+        right = centers[index + right[0]] if len(right) else centers[-1]
+        peaks.append((float(centers[index]), float(left), float(right)))
+
+    return peaks
+
+
+def _peak_opacity(peaks, max_opacity: float, scalar_range) -> np.ndarray:
+    # Every peak is a tent, overlapping tents are combined by taking their maximum
+    x = np.unique(
+        np.concatenate([scalar_range, *[[left, center, right] for center, left, right in peaks]])
+    )
+    opacity = np.zeros_like(x)
+
+    for center, left, right in peaks:
+        tent = np.interp(x, [left, center, right], [0, max_opacity, 0], left=0, right=0)
+        opacity = np.maximum(opacity, tent)
+
+    return np.column_stack((x, opacity))
+
+
+def suggest_transfer_function(
+    histogram,
+    method: str = "otsu",
+    colormap: str = "viridis",
+    max_opacity: float = 1.0,
+    robust_percentiles=(1, 99),
+    peaks: int = 3,
+    skip_background: bool = True,
+    bins: int = 512,
+) -> tuple[OpacityTransferFunction, ColorTransferFunction]:
+    """Suggest opacity and color nodes from the histogram of the data.
+
+    Methods:
+        - ``"percentiles"``: opacity ramp over the robust range of the values
+        - ``"otsu"``: transparent below the Otsu threshold, ramp above it
+        - ``"peaks"``: a tent of opacity around each of the most prominent peaks,
+          ``"percentiles"`` when there are none
+
+    Args:
+        histogram: A ``Histogram``, or a ``MultiResolutionHistogram`` re-binned to ``bins``.
+        colormap: The preset spread over the robust range of the values.
+        max_opacity: The opacity of the most opaque node.
+        robust_percentiles: Percentiles bounding the robust range of the values.
+        peaks: Number of peaks of the ``"peaks"`` method.
+        skip_background: Ignore the peak of the lowest values when it is the highest
+            one, usually the background around the object.
+
+    Returns:
+        The transfer functions, use ``to_nodes()`` to apply them to the editor.
+    """
+    histogram = _as_histogram(histogram, bins)
+    scalar_range = histogram.scalar_range
+    low, high = histogram_percentiles(histogram, robust_percentiles)
+
+    if high <= low:
+        low, high = scalar_range
+
+    if method == "percentiles":
+        opacity = [
+            [scalar_range[0], 0],
+            [low, 0],
+            [high, max_opacity],
+            [scalar_range[1], max_opacity],
+        ]
+    elif method == "otsu":
+        threshold = min(max(otsu_threshold(histogram), low), high)
+        opacity = [
+            [scalar_range[0], 0],
+            [threshold, 0],
+            [high, max_opacity],
+            [scalar_range[1], max_opacity],
+        ]
+    elif method == "peaks":
+        found = find_peaks(histogram, count=peaks + int(skip_background))
+
+        if skip_background and len(found) > 1:
+            counts = [
+                histogram.counts[np.searchsorted(histogram.edges, c, side="right") - 1]
+                for c, _, _ in found
+            ]
+            if int(np.argmax(counts)) == 0:
+                found = found[1:]
+
+        if not found:
+            # Nothing stands out, e.g. uniform data
+            return suggest_transfer_function(
+                histogram, "percentiles", colormap, max_opacity, robust_percentiles
+            )
+
+        opacity = _peak_opacity(found[:peaks], max_opacity, scalar_range)
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected one of {SUGGESTION_METHODS}")
+
+    colors = get_presets().color_nodes(colormap, [low, high], as_array=True)
+    # Clamp the colors outside of the robust range
+    colors = np.vstack(
+        ([scalar_range[0], *colors[0, 1:]], colors, [scalar_range[1], *colors[-1, 1:]])
+    )
+
+    opacity = OpacityTransferFunction(_deduplicate(np.asarray(opacity, dtype=np.float64)))
+    color = ColorTransferFunction(_deduplicate(colors))
+
+    return opacity, color
+
+
+def _deduplicate(nodes: np.ndarray) -> np.ndarray:
+    # Keep the last node of each x, the editor needs strictly increasing x
+    nodes = nodes[np.argsort(nodes[:, 0], kind="stable")]
+    keep = np.append(np.diff(nodes[:, 0]) > 0, True)
+    return nodes[keep]
@@ -0,0 +1,190 @@
+"""Run the computations feeding the editor off the trame event loop.
+
+Histograms of large volumes take long enough to freeze every session of the
+server when computed in a state change callback. ``LatestTask`` runs them in an
+executor from an ``async`` callback instead, a newer run cancelling the stale
+one, and ``HistogramUpdater`` sets the editor props once the latest is done::
+
+    updater = HistogramUpdater(state, histograms="histograms", histograms_range="hist_y_range")
+
+
+    @state.change("x_range")
+    async def on_x_range_changed(x_range, **_):
+        await updater.update(histogram.rebin, x_range)
+
+Meanwhile the editor keeps showing the previous histogram, with its ``pending``
+indicator on. Histograms computed elsewhere, such as the time steps of a
+``HistogramScheduler``, are shown with ``HistogramUpdater.show``.
+"""
+
+import asyncio
+import functools
+
+from trame_color_opacity_editor.utils.histograms import Histogram
+
+__all__ = [
+    "LatestTask",
+    "HistogramUpdater",
+]
+
+
+class LatestTask:
+    """Run computations in an executor, a new run cancelling the previous one.
+
+    A run that has not started yet is dropped from the executor. One already
+    running completes in its thread, but its result is discarded.
+
+    Args:
+        executor: A ``concurrent.futures`` executor, the default one of the loop when ``None``.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self._future = None
+
+    @property
+    def pending(self) -> bool:
+        """Whether a run is in progress."""
+        return self._future is not None
+
+    async def run(self, func, *args, **kwargs):
+        """The result of ``func(*args, **kwargs)``, computed in the executor.
+
+        Raises:
+            asyncio.CancelledError: When cancelled, or superseded by a newer run.
+        """
+        self.cancel()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        self._future = future
+
+        try:
+            return await future
+        finally:
+            if self._future is future:
+                self._future = None
+
+    def cancel(self):
+        """Cancel the run in progress, if any."""
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+
+class HistogramUpdater:
+    """Set the histogram props of an editor from histograms computed in an executor.
+
+    Args:
+        state: The trame state.
+        histograms: The state variable bound to ``histograms``.
+        histograms_range: The state variable bound to ``histograms_range``.
+        scalar_range: The state variable bound to ``scalar_range``, left alone when ``None``.
+        pending: The state variable bound to ``pending``.
+        log: Whether the bin heights are ``log10(count)``.
+        packed: Whether the histograms are sent as a binary buffer, see ``Histogram.histograms``.
+        executor: See ``LatestTask``.
+    """
+
+    def __init__(
+        self,
+        state,
+        histograms: str = "histograms",
+        histograms_range: str = "histograms_range",
+        scalar_range: str | None = None,
+        pending: str = "histograms_pending",
+        log: bool = True,
+        packed: bool = False,
+        executor=None,
+    ):
+        self.state = state
+        self.histograms = histograms
+        self.histograms_range = histograms_range
+        self.scalar_range = scalar_range
+        self.pending = pending
+        self.log = log
+        self.packed = packed
+        self.task = LatestTask(executor)
+        # Bumped by every update, ``show`` and ``cancel``, each superseding the update in progress
+        self._generation = 0
+
+    async def update(self, func, *args, store=None) -> bool:
+        """Compute a ``Histogram`` with ``func(*args)`` and show it in the editor.
+
+        Args:
+            func: Returns a ``Histogram``, called in the executor.
+            store: A ``ContentStore`` to put the histograms in, for histograms that are the same
+                for every session.
+
+        Returns:
+            ``False`` when superseded by a newer update, ``show`` or ``cancel`` before completing.
+
+        Raises:
+            asyncio.CancelledError: When the task awaiting the update is cancelled.
+        """
+        self._generation += 1
+        generation = self._generation
+
+        with self.state:
+            self.state[self.pending] = True
+
+        try:
+            histogram, histograms = await self.task.run(self._compute, func, args, store)
+        except asyncio.CancelledError:
+            if generation != self._generation:
+                # Whatever superseded the update takes care of the indicator
+                return False
+
+            self._set(pending=False)
+            raise
+        except Exception:
+            self._set(pending=False)
+            raise
+
+        self._show(histogram, histograms)
+        return True
+
+    def show(self, histogram: Histogram, store=None):
+        """Show a ``Histogram`` computed elsewhere, e.g. by ``HistogramScheduler``.
+
+        The update in progress, if any, is cancelled so that it does not replace it.
+
+        Args:
+            histogram: The histogram to show.
+            store: See ``update``.
+        """
+        self._generation += 1
+        self.task.cancel()
+        self._show(histogram, self._histograms(histogram, store))
+
+    def cancel(self):
+        """Cancel the update in progress, the previous histogram stays shown."""
+        self._generation += 1
+        self.task.cancel()
+        self._set(pending=False)
+
+    def _compute(self, func, args, store) -> tuple[Histogram, list | dict]:
+        # Everything but setting the state happens in the executor
+        histogram = func(*args)
+        return histogram, self._histograms(histogram, store)
+
+    def _histograms(self, histogram: Histogram, store) -> list | dict:
+        if store is not None:
+            return store.put_array(histogram.histograms(self.log, packed=True))
+
+        return histogram.histograms(self.log, packed=self.packed)
+
+    def _show(self, histogram: Histogram, histograms: list | dict):
+        self._set(
+            histograms=histograms,
+            histograms_range=histogram.histograms_range(self.log),
+            scalar_range=histogram.scalar_range,
+            pending=False,
+        )
+
+    def _set(self, **values):
+        with self.state:
+            for name, value in values.items():
+                variable = getattr(self, name)
+
+                if variable is not None:
+                    self.state[variable] = value
@@ -0,0 +1,136 @@
+"""Load multi-page TIFF volumes frame by frame into a preallocated array.
+
+Requires Pillow (``pip install pillow``).
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.histograms import (
+    Histogram,
+    compute_histogram,
+    histogram_from_occurrences,
+    is_small_int,
+)
+
+__all__ = [
+    "TiffVolume",
+    "read_tiff_info",
+    "load_tiff",
+]
+
+# Pillow modes of single channel images and the dtype of their pixels, bilevel
+# images are loaded as 0 / 1 bytes so their values can be counted like any other
+_MODE_DTYPES = {
+    "1": np.dtype(np.uint8),
+    "L": np.dtype(np.uint8),
+    "I;16": np.dtype("<u2"),
+    "I;16L": np.dtype("<u2"),
+    "I;16B": np.dtype(">u2"),
+    "I;16S": np.dtype("<i2"),
+    "I": np.dtype(np.int32),
+    "F": np.dtype(np.float32),
+}
+
+
+class TiffVolume:
+    """A volume loaded by ``load_tiff``.
+
+    Args:
+        data: The ``(frames, height, width)`` array, a ``np.memmap`` when memory-mapped.
+        scalar_range: ``[min, max]`` of the finite values.
+        histogram: The histogram, when requested.
+    """
+
+    def __init__(self, data: np.ndarray, scalar_range: list[float], histogram: Histogram | None):
+        self.data = data
+        self.scalar_range = scalar_range
+        self.histogram = histogram
+
+
+def _open(path):
+    from PIL import Image
+
+    return Image.open(path)
+
+
+def read_tiff_info(path) -> tuple[tuple[int, int, int], np.dtype]:
+    """Shape ``(frames, height, width)`` and dtype of a multi-page TIFF, without decoding it."""
+    with _open(path) as image:
+        width, height = image.size
+        dtype = _MODE_DTYPES.get(image.mode)
+
+        if dtype is None:
+            dtype = np.asarray(image).dtype
+
+        return (getattr(image, "n_frames", 1), height, width), dtype
+
+
+def load_tiff(
+    path,
+    mmap_path=None,
+    histogram_bins: int | None = None,
+    progress=None,
+) -> TiffVolume:
+    """Decode the frames of a multi-page TIFF straight into a preallocated array.
+
+    Only one frame is held in memory besides the volume. The scalar range is
+    computed along the way, and so is the histogram of 8 and 16 bit integer data;
+    the histogram of other types is computed from the loaded array afterwards,
+    once the range is known.
+
+    Args:
+        path: The TIFF file.
+        mmap_path: Load into a memory-mapped ``.npy`` file created at this path.
+        histogram_bins: Number of bins of the histogram, ``None`` to skip it.
+        progress: Called with ``(frames_loaded, frames)`` after every frame.
+    """
+    shape, dtype = read_tiff_info(path)
+
+    if mmap_path is not None:
+        data = np.lib.format.open_memmap(Path(mmap_path), mode="w+", dtype=dtype, shape=shape)
+    else:
+        data = np.empty(shape, dtype=dtype)
+
+    count_values = histogram_bins is not None and is_small_int(dtype)
+    occurrences = None
+    lo, hi = np.inf, -np.inf
+
+    if count_values:
+        info = np.iinfo(dtype)
+        occurrences = np.zeros(int(info.max) - int(info.min) + 1, dtype=np.int64)
+
+    with _open(path) as image:
+        for i in range(shape[0]):
+            image.seek(i)
+            frame = data[i]
+            frame[...] = np.asarray(image)
+
+            if count_values:
+                values = frame.reshape(-1)
+                if info.min != 0:
+                    values = values.astype(np.int32) - info.min
+                occurrences += np.bincount(values, minlength=len(occurrences))
+            elif frame.size:
+                finite = frame[np.isfinite(frame)] if dtype.kind == "f" else frame
+                if finite.size:
+                    lo, hi = min(lo, finite.min()), max(hi, finite.max())
+
+            if progress is not None:
+                progress(i + 1, shape[0])
+
+    if isinstance(data, np.memmap):
+        data.flush()
+
+    histogram = None
+
+    if count_values:
+        histogram = histogram_from_occurrences(occurrences, dtype, histogram_bins, None)
+        scalar_range = histogram.scalar_range
+    else:
+        scalar_range = [float(lo), float(hi)] if lo <= hi else [0.0, 1.0]
+        if histogram_bins is not None:
+            histogram = compute_histogram(data, bins=histogram_bins, scalar_range=scalar_range)
+
+    return TiffVolume(data, scalar_range, histogram)
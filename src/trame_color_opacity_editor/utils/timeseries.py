@@ -0,0 +1,204 @@
+"""Histograms of the time steps of a time series, computed in the background.
+
+The statistics of the current time step are computed first, then those of the
+steps that follow it, so stepping through the series finds them ready. They
+are cached within a memory budget, the least recently used steps being evicted.
+"""
+
+import threading
+from concurrent.futures import Future
+
+from trame_color_opacity_editor.utils.cache import LRUCache
+from trame_color_opacity_editor.utils.histograms import Histogram, compute_histogram
+
+__all__ = [
+    "StepStatistics",
+    "HistogramScheduler",
+]
+
+
+class StepStatistics:
+    """Scalar range and histogram of a time step.
+
+    Args:
+        step: The index of the time step.
+        scalar_range: ``[min, max]`` of the finite values.
+        histogram: The histogram over ``scalar_range``.
+    """
+
+    def __init__(self, step: int, scalar_range: list[float], histogram: Histogram):
+        self.step = step
+        self.scalar_range = scalar_range
+        self.histogram = histogram
+
+    @property
+    def nbytes(self) -> int:
+        return self.histogram.counts.nbytes + self.histogram.edges.nbytes
+
+
+class HistogramScheduler:
+    """Compute the statistics of the time steps on a pool of worker threads.
+
+    The heavy loops of ``compute_histogram`` release the GIL, so threads run them
+    in parallel without copying the volumes to other processes.
+
+    Args:
+        load_step: Returns the array of a time step, called from the worker threads.
+        steps: Number of time steps, at least 1.
+        bins: Number of bins of the histograms.
+        max_bytes: Memory budget of the cached statistics.
+        prefetch: Number of steps computed ahead of the current one, wrapping around.
+        max_workers: Number of worker threads.
+        on_ready: Called with the ``StepStatistics`` of the current step once available.
+        loop: The asyncio loop to call ``on_ready`` from, e.g. ``server.loop``. Without it,
+            ``on_ready`` is called from the worker threads.
+
+    Raises:
+        ValueError: When ``steps`` is less than 1.
+
+    To show the current step in the editor, pass the ``show`` method of a ``HistogramUpdater``::
+
+        updater = HistogramUpdater(state, scalar_range="x_range")
+        scheduler = HistogramScheduler(
+            load_step,
+            steps,
+            on_ready=lambda statistics: updater.show(statistics.histogram),
+            loop=server.loop,
+        )
+    """
+
+    def __init__(
+        self,
+        load_step,
+        steps: int,
+        bins: int = 1 << 16,
+        max_bytes: int = 256 << 20,
+        prefetch: int = 4,
+        max_workers: int = 2,
+        on_ready=None,
+        loop=None,
+    ):
+        if steps < 1:
+            raise ValueError(f"steps must be at least 1, got {steps}")
+
+        self.load_step = load_step
+        self.steps = steps
+        self.bins = bins
+        self.prefetch = prefetch
+        self.max_workers = max_workers
+        self.on_ready = on_ready
+        self.loop = loop
+        self.cache = LRUCache(maxsize=steps, max_bytes=max_bytes, sizeof=_nbytes)
+        self.current = None
+        self._futures = {}
+        self._pending = set()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._closed = False
+
+    def get(self, step: int) -> StepStatistics | None:
+        """The cached statistics of ``step``, if any."""
+        return self.cache.get(step)
+
+    def request(self, step: int) -> Future:
+        """Make ``step`` the current step, computed first, and prefetch the following ones.
+
+        Steps queued for prefetching that are not around the new current step are
+        dropped, unless already running.
+
+        Returns:
+            A future of the ``StepStatistics`` of ``step``.
+        """
+        cached = self.cache.get(step)
+
+        with self._condition:
+            self.current = step
+            window = [(step + offset) % self.steps for offset in range(self.prefetch + 1)]
+
+            for stale in self._pending - set(window):
+                self._pending.discard(stale)
+                self._futures.pop(stale).cancel()
+
+            for queued in window:
+                done = cached is not None if queued == step else queued in self.cache
+
+                if not done and queued not in self._futures:
+                    self._futures[queued] = Future()
+                    self._pending.add(queued)
+
+            future = self._futures.get(step)
+            self._start_workers()
+            self._condition.notify_all()
+
+        if cached is None:
+            return future
+
+        future = Future()
+        future.set_result(cached)
+
+        if self.on_ready is not None:
+            self.on_ready(cached)
+
+        return future
+
+    def shutdown(self):
+        """Stop the workers once their current step is done, the queued steps are dropped."""
+        with self._condition:
+            self._closed = True
+
+            for step in self._pending:
+                self._futures.pop(step).cancel()
+
+            self._pending.clear()
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            worker.join()
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_workers and not self._closed:
+            worker = threading.Thread(target=self._work, daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _priority(self, step: int) -> int:
+        # The current step first, then the closest steps after it
+        return (step - self.current) % self.steps
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+
+                if self._closed:
+                    return
+
+                step = min(self._pending, key=self._priority)
+                self._pending.discard(step)
+                future = self._futures[step]
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                histogram = compute_histogram(self.load_step(step), bins=self.bins, max_workers=1)
+                statistics = StepStatistics(step, histogram.scalar_range, histogram)
+                self.cache.put(step, statistics)
+                future.set_result(statistics)
+            except Exception as error:
+                future.set_exception(error)
+                statistics = None
+            finally:
+                with self._condition:
+                    self._futures.pop(step, None)
+
+            if statistics is not None and step == self.current and self.on_ready is not None:
+                if self.loop is not None:
+                    self.loop.call_soon_threadsafe(self.on_ready, statistics)
+                else:
+                    self.on_ready(statistics)
+
+
+def _nbytes(statistics: StepStatistics) -> int:
+    return statistics.nbytes
@@ -0,0 +1,292 @@
+"""NumPy backed models of the nodes edited by ``ColorOpacityEditor``.
+
+The nodes are stored as a single sorted ``(N, 1 + C)`` float64 array of
+``[x, *values]`` rows, ``C`` being 1 for opacity and 3 for color.
+"""
+
+import weakref
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.nodes import (
+    color_nodes_to_array,
+    opacity_nodes_to_array,
+    simplify_nodes,
+)
+from trame_color_opacity_editor.utils.packing import pack_array
+
+__all__ = [
+    "OpacityTransferFunction",
+    "ColorTransferFunction",
+]
+
+
+def _span(range) -> float:
+    return abs(range[1] - range[0])
+
+
+class _TransferFunction(ABC):
+    __slots__ = ("_nodes", "_state", "_state_name", "_packed", "_on_change", "__weakref__")
+
+    NODE_SIZE = 0
+
+    def __init__(self, nodes=None):
+        self._nodes = np.empty((0, self.NODE_SIZE))
+        self._state = None
+        self._state_name = None
+        self._packed = False
+        self._on_change = None
+
+        if nodes is not None:
+            self.set_nodes(nodes)
+
+    @classmethod
+    @abstractmethod
+    def _to_array(cls, nodes) -> np.ndarray:
+        """The nodes in any format accepted by the editor, as a ``(N, 1 + C)`` array."""
+
+    @classmethod
+    def linear(cls, values, scalar_range):
+        """Nodes with the given values, evenly spaced over ``scalar_range``."""
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        x = np.linspace(scalar_range[0], scalar_range[1], max(len(values), 2))[: len(values)]
+        return cls(np.column_stack((x, values)))
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_nodes()!r})"
+
+    @property
+    def nodes(self) -> np.ndarray:
+        """Read-only view of the ``(N, 1 + C)`` node array."""
+        view = self._nodes.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.nodes[:, 0]
+
+    @property
+    def scalar_range(self) -> list[float]:
+        if len(self._nodes) == 0:
+            return [0.0, 1.0]
+
+        return [float(self._nodes[0, 0]), float(self._nodes[-1, 0])]
+
+    # -------------------------------------------------------------------------
+    # Editing
+    # -------------------------------------------------------------------------
+
+    def set_nodes(self, nodes):
+        """Replace all the nodes, in any format accepted by the editor (list, array, packed)."""
+        array = self._to_array(nodes).copy()
+        self._nodes = array[np.argsort(array[:, 0], kind="stable")]
+        self._push()
+
+    def insert(self, x: float, value) -> int:
+        """Insert a node keeping the nodes sorted, a node at the same ``x`` is replaced.
+
+        Returns:
+            The index of the node.
+        """
+        row = np.concatenate(([x], np.ravel(value))).astype(np.float64)
+        index = int(np.searchsorted(self._nodes[:, 0], x))
+
+        if index < len(self._nodes) and self._nodes[index, 0] == x:
+            self._nodes[index] = row
+        else:
+            self._nodes = np.insert(self._nodes, index, row, axis=0)
+
+        self._push()
+        return index
+
+    def remove(self, index: int):
+        self._nodes = np.delete(self._nodes, index, axis=0)
+        self._push()
+
+    def simplify(self, tolerance: float = 1e-3) -> float:
+        """Remove the nodes that are within ``tolerance`` of the line between their neighbors.
+
+        See ``utils.nodes.simplify_nodes``, the range of the nodes is unchanged.
+
+        Returns:
+            The largest interpolation error introduced, on any value.
+        """
+        self._nodes, error = simplify_nodes(self._nodes, tolerance)
+        self._push()
+        return error
+
+    def node_modified(self, index: int, node):
+        """Apply a ``*NodeModified`` event of the editor."""
+        self._nodes[index] = self._to_array([node])[0]
+        self._push()
+
+    def node_added(self, index: int, node):
+        """Apply a ``*NodeAdded`` event of the editor."""
+        self._nodes = np.insert(self._nodes, index, self._to_array([node])[0], axis=0)
+        self._push()
+
+    def node_removed(self, index: int):
+        """Apply a ``*NodeRemoved`` event of the editor."""
+        self.remove(index)
+
+    # -------------------------------------------------------------------------
+    # Scaling, mirrors scaleNodes / unscaleNodes of the editor
+    # -------------------------------------------------------------------------
+
+    def _rescaled(self, x_range, y_range, inverse: bool):
+        nodes = self._nodes.copy()
+
+        if x_range is not None:
+            if inverse:
+                nodes[:, 0] = x_range[0] + nodes[:, 0] * _span(x_range)
+            else:
+                nodes[:, 0] = (nodes[:, 0] - x_range[0]) / _span(x_range)
+
+        if y_range is not None and self.NODE_SIZE == 2:
+            if inverse:
+                nodes[:, 1] = y_range[0] + nodes[:, 1] * _span(y_range)
+            else:
+                nodes[:, 1] = (nodes[:, 1] - y_range[0]) / _span(y_range)
+
+        return type(self)(nodes)
+
+    def scale(self, x_range=None, y_range=None):
+        """A copy with the nodes mapped from ``x_range`` (and ``y_range``) to ``[0, 1]``."""
+        return self._rescaled(x_range, y_range, inverse=False)
+
+    def unscale(self, x_range=None, y_range=None):
+        """A copy with the nodes mapped from ``[0, 1]`` to ``x_range`` (and ``y_range``)."""
+        return self._rescaled(x_range, y_range, inverse=True)
+
+    def rescale(self, scalar_range):
+        """A copy with the nodes stretched from their current range to ``scalar_range``.
+
+        Nodes that all share the same ``x`` (e.g. a single node) are moved to the center of
+        ``scalar_range``.
+        """
+        if _span(self.scalar_range) == 0:
+            nodes = self._nodes.copy()
+            nodes[:, 0] = (scalar_range[0] + scalar_range[1]) / 2
+            return type(self)(nodes)
+
+        return self.scale(self.scalar_range).unscale(scalar_range)
+
+    # -------------------------------------------------------------------------
+    # Evaluation
+    # -------------------------------------------------------------------------
+
+    def __call__(self, scalars) -> np.ndarray:
+        """Evaluate at arbitrary scalars, linearly between nodes and clamped outside of them.
+
+        A function without nodes evaluates to ``0``.
+        """
+        scalars = np.asarray(scalars, dtype=np.float64)
+
+        if len(self._nodes) == 0:
+            shape = scalars.shape if self.NODE_SIZE == 2 else (*scalars.shape, self.NODE_SIZE - 1)
+            return np.zeros(shape)
+
+        columns = [
+            np.interp(scalars, self._nodes[:, 0], self._nodes[:, i])
+            for i in range(1, self.NODE_SIZE)
+        ]
+
+        if self.NODE_SIZE == 2:
+            return columns[0]
+
+        return np.stack(columns, axis=-1)
+
+    # -------------------------------------------------------------------------
+    # Serialization
+    # -------------------------------------------------------------------------
+
+    @abstractmethod
+    def to_nodes(self) -> list:
+        """The nodes as the editor v-model, see ``to_packed`` for the binary form."""
+
+    def to_packed(self) -> dict:
+        """The nodes as a packed float32 array, see ``utils.packing``."""
+        return pack_array(self._nodes)
+
+    def to_state(self):
+        return self.to_packed() if self._packed else self.to_nodes()
+
+    def bind(self, state, name: str, packed: bool = False):
+        """Two-way bind to a state variable used as the v-model of an editor.
+
+        The nodes are pushed to ``state[name]`` whenever they are modified from
+        Python, and reloaded whenever the editor updates ``state[name]``.
+
+        Binding again replaces the previous binding, which stops updating the nodes.
+        """
+        rebinding = self._state is not state or self._state_name != name
+        self._state = state
+        self._state_name = name
+        self._packed = packed
+
+        if rebinding:
+            # trame has no API to remove a change callback, the previous one finds out
+            # it is no longer the current one and does nothing
+            model = weakref.ref(self)
+
+            def on_change(**kwargs):
+                tf = model()
+                value = kwargs[name]
+
+                if tf is None or tf._on_change is not on_change or value is None:
+                    return
+
+                array = tf._to_array(value)
+                if not np.array_equal(array, tf._nodes):
+                    tf._nodes = array.copy()
+
+            self._on_change = on_change
+            state.change(name)(on_change)
+
+        self._push()
+
+    def unbind(self):
+        """Stop pushing the nodes to the state and reloading them from it."""
+        self._state = None
+        self._state_name = None
+        self._on_change = None
+
+    def _push(self):
+        if self._state is not None:
+            self._state[self._state_name] = self.to_state()
+
+
+class OpacityTransferFunction(_TransferFunction):
+    """Opacity nodes ``[[x, opacity], ...]``, see ``opacityNodes`` of ``ColorOpacityEditor``."""
+
+    __slots__ = ()
+
+    NODE_SIZE = 2
+
+    @classmethod
+    def _to_array(cls, nodes) -> np.ndarray:
+        return opacity_nodes_to_array(nodes)
+
+    def to_nodes(self) -> list:
+        return self._nodes.tolist()
+
+
+class ColorTransferFunction(_TransferFunction):
+    """Color nodes ``[[x, [r, g, b]], ...]``, see ``colorNodes`` of ``ColorOpacityEditor``."""
+
+    __slots__ = ()
+
+    NODE_SIZE = 4
+
+    @classmethod
+    def _to_array(cls, nodes) -> np.ndarray:
+        return color_nodes_to_array(nodes)
+
+    def to_nodes(self) -> list:
+        rows = self._nodes.tolist()
+        return [[row[0], row[1:]] for row in rows]
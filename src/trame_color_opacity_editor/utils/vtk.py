@@ -0,0 +1,296 @@
+"""Helpers to push the editor nodes into VTK transfer functions.
+
+VTK is not a dependency of this package, these helpers only call methods on
+the ``vtkPiecewiseFunction`` / ``vtkColorTransferFunction`` they are given.
+"""
+
+import weakref
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from trame_color_opacity_editor.utils.nodes import color_nodes_to_array, opacity_nodes_to_array
+from trame_color_opacity_editor.utils.packing import is_packed
+from trame_color_opacity_editor.utils.store import is_stored
+
+__all__ = [
+    "update_opacity_function",
+    "update_color_function",
+    "OpacityFunctionSync",
+    "ColorFunctionSync",
+]
+
+# Last content pushed into each VTK function, together with the function MTime
+# right after the push. Keyed weakly so functions are collected normally.
+_pushed_content = weakref.WeakKeyDictionary()
+
+
+def _fill_opacity_function(pwf, data: np.ndarray):
+    pwf.FillFromDataPointer(len(data), data.ravel())
+
+
+def _fill_color_function(ctf, data: np.ndarray):
+    if not hasattr(ctf, "AddRGBPoints"):
+        # VTK < 9.3, this adds (and sorts) the points one at a time
+        ctf.FillFromDataPointer(len(data), data.ravel())
+        return
+
+    from vtkmodules.util.numpy_support import numpy_to_vtk
+
+    # The bulk insertion refuses to run unless duplicates are allowed, editor
+    # nodes are strictly increasing so there are none to check for anyway.
+    allow_duplicates = ctf.GetAllowDuplicateScalars()
+    ctf.AllowDuplicateScalarsOn()
+    ctf.RemoveAllPoints()
+    ctf.AddRGBPoints(
+        numpy_to_vtk(np.ascontiguousarray(data[:, 0])),
+        numpy_to_vtk(np.ascontiguousarray(data[:, 1:])),
+    )
+    ctf.SetAllowDuplicateScalars(allow_duplicates)
+
+
+def _update_function(function, array: np.ndarray, fill, force: bool) -> bool:
+    previous = _pushed_content.get(function)
+
+    if not force and previous is not None:
+        mtime, content = previous
+        # The MTime check catches modifications made behind our back
+        if mtime == function.GetMTime() and np.array_equal(content, array):
+            return False
+
+    if len(array) == 0:
+        function.RemoveAllPoints()
+    else:
+        fill(function, np.ascontiguousarray(array, dtype=np.float64))
+
+    _pushed_content[function] = (function.GetMTime(), array.copy())
+
+    return True
+
+
+def update_opacity_function(pwf, nodes, force: bool = False) -> bool:
+    """Replace the points of a ``vtkPiecewiseFunction`` with the given opacity nodes.
+
+    Args:
+        pwf: The ``vtkPiecewiseFunction`` to fill.
+        nodes: The ``opacityNodes`` of the editor, as a list or an ``(N, 2)`` array.
+        force: Rebuild the function even if the nodes did not change.
+
+    Returns:
+        ``True`` if the function was rebuilt, ``False`` if it was already up to date.
+    """
+    return _update_function(pwf, opacity_nodes_to_array(nodes), _fill_opacity_function, force)
+
+
+def update_color_function(ctf, nodes, force: bool = False) -> bool:
+    """Replace the points of a ``vtkColorTransferFunction`` with the given color nodes.
+
+    Args:
+        ctf: The ``vtkColorTransferFunction`` to fill.
+        nodes: The ``colorNodes`` of the editor, as a list or an ``(N, 4)`` array.
+        force: Rebuild the function even if the nodes did not change.
+
+    Returns:
+        ``True`` if the function was rebuilt, ``False`` if it was already up to date.
+    """
+    return _update_function(ctf, color_nodes_to_array(nodes), _fill_color_function, force)
+
+
+class _FunctionSync(ABC):
+    NODE_SIZE = 0
+
+    def __init__(self, function, get_nodes=None, on_update=None):
+        self.function = function
+        self._get_nodes = get_nodes
+        self._on_update = on_update
+        # Shadow copy of what was pushed into the function, flat [x, *values] rows
+        self._nodes = np.empty((0, self.NODE_SIZE))
+        self._mtime = None
+        # Whether the v-model is packed, its nodes then only have float32 precision
+        self._float32 = False
+        # Number of times drift was detected and the function rebuilt
+        self.resync_count = 0
+
+        if get_nodes is not None:
+            self.set_nodes(get_nodes())
+
+    @abstractmethod
+    def _to_array(self, nodes) -> np.ndarray:
+        """The nodes as flat ``[x, *values]`` rows."""
+
+    @abstractmethod
+    def _update(self, array: np.ndarray):
+        """Replace all the points of the function."""
+
+    @abstractmethod
+    def _set_node(self, index: int, row: np.ndarray) -> bool:
+        """Set a point of the function in place, returns whether VTK accepted it."""
+
+    @abstractmethod
+    def _add_node(self, row: np.ndarray) -> int:
+        """Add a point to the function, returns its index."""
+
+    def _in_sync(self) -> bool:
+        return self._mtime == self.function.GetMTime() and self.function.GetSize() == len(
+            self._nodes
+        )
+
+    def _equal(self, a: np.ndarray, b: np.ndarray) -> bool:
+        # The node events carry float64 values, the packed v-model their float32 rounding
+        if self._float32:
+            return np.array_equal(a.astype(np.float32), b.astype(np.float32))
+
+        return np.array_equal(a, b)
+
+    def _commit(self):
+        self._mtime = self.function.GetMTime()
+        if self._on_update is not None:
+            self._on_update()
+
+    def _rebuild(self, nodes: np.ndarray) -> bool:
+        # The shadow copy with the event applied is more recent than ``get_nodes()``, the
+        # v-model update may only follow the event
+        self.resync_count += 1
+        self._mtime = None
+        return self.set_nodes(nodes[np.argsort(nodes[:, 0], kind="stable")])
+
+    def set_nodes(self, nodes) -> bool:
+        """Make the function match the full list of nodes.
+
+        Returns:
+            ``True`` if the function was modified.
+        """
+        array = self._to_array(nodes)
+        self._float32 = is_packed(nodes) or is_stored(nodes)
+
+        if self._in_sync() and self._equal(self._nodes, array):
+            return False
+
+        self._update(array)
+        self._nodes = array.copy()
+        self._commit()
+
+        return True
+
+    def resync(self) -> bool:
+        """Rebuild the function from the full node list, if ``get_nodes`` was provided."""
+        if self._get_nodes is None:
+            # Drop the shadow copy so the next ``set_nodes`` rebuilds the function
+            self._mtime = None
+            return False
+
+        self.resync_count += 1
+        return self.set_nodes(self._get_nodes())
+
+    def node_modified(self, index: int, node) -> bool:
+        row = self._to_array([node])[0]
+
+        # An index the shadow copy does not know means events were missed
+        if not (0 <= index < len(self._nodes)):
+            return self.resync()
+
+        if self._in_sync():
+            if self._equal(self._nodes[index], row):
+                return False
+
+            # Moving a node past its neighbours would reorder the points in VTK
+            in_order = (index == 0 or row[0] > self._nodes[index - 1][0]) and (
+                index == len(self._nodes) - 1 or row[0] < self._nodes[index + 1][0]
+            )
+
+            if in_order and self._set_node(index, row):
+                self._nodes[index] = row
+                self._commit()
+                return True
+
+        nodes = self._nodes.copy()
+        nodes[index] = row
+        return self._rebuild(nodes)
+
+    def node_added(self, index: int, node) -> bool:
+        row = self._to_array([node])[0]
+
+        if not (0 <= index <= len(self._nodes)):
+            return self.resync()
+
+        if self._in_sync():
+            if self._add_node(row) == index and self.function.GetSize() == len(self._nodes) + 1:
+                self._nodes = np.insert(self._nodes, index, row, axis=0)
+                self._commit()
+                return True
+
+        return self._rebuild(np.insert(self._nodes, index, row, axis=0))
+
+    def node_removed(self, index: int) -> bool:
+        if not (0 <= index < len(self._nodes)):
+            return self.resync()
+
+        if self._in_sync():
+            if self.function.RemovePoint(self._nodes[index][0]) == index:
+                self._nodes = np.delete(self._nodes, index, axis=0)
+                self._commit()
+                return True
+
+        return self._rebuild(np.delete(self._nodes, index, axis=0))
+
+
+class OpacityFunctionSync(_FunctionSync):
+    """Keep a ``vtkPiecewiseFunction`` in sync with the opacity node events of an editor.
+
+    Each ``opacityNodeModified`` / ``opacityNodeAdded`` / ``opacityNodeRemoved`` event
+    patches a single point of the function. When the function was modified elsewhere,
+    the whole function is rebuilt from the nodes known to the sync with the event
+    applied. When an index is out of range, events were missed and it is rebuilt from
+    ``get_nodes()`` instead.
+
+    Args:
+        function: The ``vtkPiecewiseFunction`` to keep in sync.
+        get_nodes: Callable returning the full list of opacity nodes, used to resync.
+        on_update: Callable invoked every time the function is modified.
+    """
+
+    NODE_SIZE = 2
+
+    def _to_array(self, nodes) -> np.ndarray:
+        return opacity_nodes_to_array(nodes)
+
+    def _update(self, array: np.ndarray):
+        update_opacity_function(self.function, array, force=True)
+
+    def _set_node(self, index: int, row: np.ndarray) -> bool:
+        value = [0.0] * 4
+        self.function.GetNodeValue(index, value)
+        value[:2] = row
+        return self.function.SetNodeValue(index, value) == 1
+
+    def _add_node(self, row: np.ndarray) -> int:
+        return self.function.AddPoint(*row)
+
+
+class ColorFunctionSync(_FunctionSync):
+    """Keep a ``vtkColorTransferFunction`` in sync with the color node events of an editor.
+
+    See :class:`OpacityFunctionSync`.
+
+    Args:
+        function: The ``vtkColorTransferFunction`` to keep in sync.
+        get_nodes: Callable returning the full list of color nodes, used to resync.
+        on_update: Callable invoked every time the function is modified.
+    """
+
+    NODE_SIZE = 4
+
+    def _to_array(self, nodes) -> np.ndarray:
+        return color_nodes_to_array(nodes)
+
+    def _update(self, array: np.ndarray):
+        update_color_function(self.function, array, force=True)
+
+    def _set_node(self, index: int, row: np.ndarray) -> bool:
+        value = [0.0] * 6
+        self.function.GetNodeValue(index, value)
+        value[:4] = row
+        return self.function.SetNodeValue(index, value) == 1
+
+    def _add_node(self, row: np.ndarray) -> int:
+        return self.function.AddRGBPoint(*row)
@@ -1,10 +1,14 @@
 from typing import Sequence
+
+import numpy as np
 from trame_client.widgets.core import AbstractElement
 
 from trame_color_opacity_editor import module
+from trame_color_opacity_editor.utils.packing import pack_array
 
 __all__ = [
     "ColorOpacityEditor",
+    "PresetPicker",
 ]
 
 
@@ -29,11 +33,28 @@ def add_named_models(el: HtmlElement, named_models: Sequence[str | tuple[str, st
         el._event_names.append((f"update_{python_name}", f"update:{js_name}"))
 
 
+def pack_array_defaults(kwargs: dict, names: Sequence[str]):
+    """Replace NumPy default values, e.g. ``histograms=("hist", array)``, by packed arrays."""
+    for name in names:
+        value = kwargs.get(name)
+        if isinstance(value, tuple) and len(value) > 1 and isinstance(value[1], np.ndarray):
+            kwargs[name] = (value[0], pack_array(value[1]), *value[2:])
+
+
 class ColorOpacityEditor(HtmlElement):
+    # Properties that can be given as NumPy arrays, they travel as packed float32 buffers
+    PACKED_PROPERTIES = [
+        "histograms",
+        "v_model_colorNodes",
+        "v_model_opacityNodes",
+    ]
+
     def __init__(
         self,
         **kwargs,
     ):
+        pack_array_defaults(kwargs, self.PACKED_PROPERTIES)
+
         super().__init__(
             "trame-coe-color-opacity-editor",
             **kwargs,
@@ -42,6 +63,7 @@ class ColorOpacityEditor(HtmlElement):
         named_models = [
             "colorNodes",
             "opacityNodes",
+            "latencyStamp",
         ]
 
         self._attr_names += [
@@ -52,12 +74,21 @@ class ColorOpacityEditor(HtmlElement):
             ("background_opacity", "backgroundOpacity"),
             "style",
             ("show_histograms", "showHistograms"),
+            "pending",
             ("histograms_color", "histogramsColor"),
+            ("joint_histogram", "jointHistogram"),
+            ("show_joint_histogram", "showJointHistogram"),
+            ("offscreen_rendering", "offscreenRendering"),
             ("viewport_padding", "viewportPadding"),
             ("handle_color", "handleColor"),
             ("handle_border_color", "handleBorderColor"),
             ("handle_radius", "handleRadius"),
             ("line_width", "lineWidth"),
+            ("update_policy", "updatePolicy"),
+            ("max_update_rate", "maxUpdateRate"),
+            "instrument",
+            ("latency_ack", "latencyAck"),
+            ("history_size", "historySize"),
         ]
 
         self._event_names += [
@@ -67,6 +98,35 @@ class ColorOpacityEditor(HtmlElement):
             ("color_node_modified", "colorNodeModified"),
             ("color_node_added", "colorNodeAdded"),
             ("color_node_removed", "colorNodeRemoved"),
+            "latency",
+            ("drag_start", "dragStart"),
+            ("drag_end", "dragEnd"),
+            ("history_changed", "historyChanged"),
         ]
 
         add_named_models(self, named_models)
+
+
+class PresetPicker(HtmlElement):
+    """List of the colormap presets drawn from a single sprite atlas, see ``utils.atlas``.
+
+    ``v_model`` holds the name of the selected preset.
+    """
+
+    def __init__(
+        self,
+        **kwargs,
+    ):
+        super().__init__(
+            "trame-coe-preset-picker",
+            **kwargs,
+        )
+
+        self._attr_names += [
+            "src",
+            "names",
+            ("swatch_size", "swatchSize"),
+            ("show_names", "showNames"),
+        ]
+
+        self._event_names += []
@@ -90,6 +90,8 @@ class ControlsView(HtmlElement):
             ("node_modified", "nodeModified"),
             ("node_added", "nodeAdded"),
             ("node_removed", "nodeRemoved"),
+            ("drag_start", "dragStart"),
+            ("drag_end", "dragEnd"),
         ]
 
         add_named_models(self, named_models)
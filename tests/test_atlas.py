@@ -0,0 +1,51 @@
+import io
+
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.atlas import PresetAtlas, encode_png
+from trame_color_opacity_editor.utils.presets import PresetLibrary, write_presets
+
+
+@pytest.fixture
+def presets(tmp_path):
+    path = tmp_path / "presets.bin"
+    write_presets(
+        path,
+        {
+            "RB": {"color": [[0, 1, 0, 0], [1, 0, 0, 1]]},
+            "WB": {"color": [[0, 1, 1, 1], [1, 0, 0, 0]]},
+        },
+    )
+    return PresetLibrary(path)
+
+
+def test_rasterize(presets, tmp_path):
+    atlas = PresetAtlas(presets, swatch_size=[3, 2], cache_dir=tmp_path / "cache")
+
+    image = atlas.rasterize()
+    assert image.shape == (4, 3, 4)
+    np.testing.assert_array_equal(
+        image[1], [[255, 0, 0, 255], [128, 0, 128, 255], [0, 0, 255, 255]]
+    )
+    np.testing.assert_array_equal(image[2, 1], [128, 128, 128, 255])
+    assert atlas.offset("WB") == 2
+
+
+def test_png(presets, tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+
+    atlas = PresetAtlas(presets, swatch_size=[8, 4], cache_dir=tmp_path / "cache")
+    png = atlas.png()
+    assert atlas.path.read_bytes() == png
+
+    decoded = np.asarray(Image.open(io.BytesIO(png)))
+    np.testing.assert_array_equal(decoded, atlas.rasterize())
+
+    # Another atlas of the same presets is read from the disk cache
+    cached = PresetAtlas(presets, swatch_size=[8, 4], cache_dir=tmp_path / "cache")
+    cached.rasterize = None
+    assert cached.png() == png
+
+    rgba = np.arange(2 * 3 * 4, dtype=np.uint8).reshape(2, 3, 4)
+    np.testing.assert_array_equal(np.asarray(Image.open(io.BytesIO(encode_png(rgba)))), rgba)
@@ -0,0 +1,103 @@
+import threading
+
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.histograms import (
+    Histogram,
+    MultiResolutionHistogram,
+    compute_histogram,
+    compute_scalar_range,
+)
+from trame_color_opacity_editor.utils.slabs import reduce_slabs
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.int8, np.uint16, np.int16])
+def test_small_int_histogram(dtype):
+    info = np.iinfo(dtype)
+    rng = np.random.default_rng(0)
+    data = rng.integers(info.min // 2, info.max // 2, size=(16, 32, 32)).astype(dtype)
+
+    histogram = compute_histogram(data, bins=251, chunk_size=1000)
+    counts, edges = np.histogram(data, bins=251)
+
+    np.testing.assert_array_equal(histogram.counts, counts)
+    np.testing.assert_allclose(histogram.edges, edges)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_float_histogram(dtype):
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(16, 32, 32)).astype(dtype)
+    data[0, 0, 0] = np.nan
+
+    scalar_range = compute_scalar_range(data, chunk_size=1000)
+    assert scalar_range == [float(np.nanmin(data)), float(np.nanmax(data))]
+
+    histogram = compute_histogram(data, bins=100, chunk_size=1000, max_workers=4)
+    counts, edges = np.histogram(data, bins=100, range=scalar_range)
+
+    np.testing.assert_array_equal(histogram.counts, counts)
+    np.testing.assert_array_equal(histogram.edges, edges)
+
+
+def test_histogram_props():
+    histogram = compute_histogram(np.array([0, 0, 0, 1, 1, 9], dtype=np.uint8), bins=3)
+
+    assert histogram.scalar_range == [0.0, 9.0]
+    assert histogram.histograms(log=False) == [[0.0, 5.0], [3.0, 0.0], [6.0, 1.0]]
+    assert histogram.histograms_range() == [0.0, pytest.approx(np.log10(5))]
+
+    empty = compute_histogram(np.empty((0, 4)))
+    assert empty.histograms_range() == [0.0, 1.0]
+
+
+def test_multiresolution_histogram():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(16, 32, 32))
+    histogram = MultiResolutionHistogram(compute_histogram(data, bins=4096))
+
+    # Aligned with the base bins, the re-binning is exact
+    full = histogram.rebin(bins=256)
+    np.testing.assert_allclose(full.counts, histogram.base.counts.reshape(256, -1).sum(axis=1))
+    assert full.scalar_range == pytest.approx(histogram.scalar_range)
+
+    # Zoomed in, the same number of bins cover a narrower range
+    lo, hi = np.quantile(data, [0.4, 0.6])
+    zoomed = histogram.rebin([lo, hi], bins=256)
+    assert zoomed.scalar_range == pytest.approx([lo, hi])
+    assert zoomed.counts.sum() == pytest.approx(0.2 * data.size, rel=0.01)
+
+    # Outside of the data, nothing to count
+    assert histogram.rebin([100, 200], bins=10).counts.sum() == 0
+
+
+def test_reduce_slabs_bounds_partial_results():
+    data = np.arange(1000).reshape(100, 10)
+    lock = threading.Lock()
+    held = [0, 0]
+
+    def read(slab):
+        with lock:
+            held[0] += 1
+            held[1] = max(held[1], held[0])
+        return int(data[slab].sum())
+
+    def combine(total, value):
+        with lock:
+            held[0] -= 1
+        return total + value
+
+    total = reduce_slabs(read, combine, 0, data, chunk_size=10, max_workers=2)
+
+    assert total == data.sum()
+    assert held[0] == 0
+    assert held[1] <= 4
+
+
+def test_log_values():
+    histogram = Histogram(np.array([0, 0.25, 1, 100]), np.arange(5))
+
+    np.testing.assert_array_equal(histogram.values(), [0, 0, 0, 2])
+    np.testing.assert_array_equal(histogram.values(log=False), [0, 0.25, 1, 100])
+    assert histogram.histograms_range() == [0.0, 2.0]
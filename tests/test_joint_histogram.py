@@ -0,0 +1,76 @@
+import numpy as np
+
+from trame_color_opacity_editor.utils.slabs import slabs
+from trame_color_opacity_editor.utils.joint_histogram import (
+    _slab_pairs,
+    compute_joint_histogram,
+)
+
+
+def _volume():
+    z, y, x = np.mgrid[:24, :20, :16]
+    return (np.sin(z / 3) + np.cos(y / 4) * x / 8).astype(np.float32)
+
+
+def test_slab_gradients_match_full_gradient():
+    data = _volume()
+    expected = np.sqrt(sum(g**2 for g in np.gradient(data)))
+
+    gradients = np.concatenate([_slab_pairs(data, slab)[1] for slab in slabs(data, 20 * 16 * 5)])
+
+    np.testing.assert_allclose(gradients, expected.reshape(-1), rtol=1e-6)
+
+
+def test_joint_histogram():
+    data = _volume()
+    gradients = np.sqrt(sum(g**2 for g in np.gradient(data)))
+
+    joint = compute_joint_histogram(data, bins=(32, 16), chunk_size=1000, max_workers=4)
+    counts, value_edges, gradient_edges = np.histogram2d(
+        data.reshape(-1),
+        gradients.reshape(-1),
+        bins=(32, 16),
+        range=(joint.scalar_range, joint.gradient_range),
+    )
+
+    assert joint.counts.shape == (32, 16)
+    assert joint.counts.sum() == data.size
+    assert joint.scalar_range == [float(data.min()), float(data.max())]
+    # Values on a bin edge may fall on either side with float32 rounding
+    assert np.abs(joint.counts - counts).sum() <= data.size * 1e-3
+    np.testing.assert_allclose(joint.value_edges, value_edges)
+
+
+def test_joint_histogram_image():
+    joint = compute_joint_histogram(_volume(), bins=(64, 32), gradient_range=[0, 1])
+
+    density = joint.density()
+    assert density.shape == (32, 64)
+    assert density.max() == 1
+
+    image = joint.to_image()
+    assert image["image"].startswith(b"\x89PNG")
+    assert image["range"] == joint.scalar_range
+
+
+def test_joint_histogram_single_slice():
+    joint = compute_joint_histogram(np.arange(12.0).reshape(1, 3, 4), bins=(4, 4))
+
+    assert joint.counts.sum() == 12
+
+
+def test_joint_histogram_near_max_values():
+    # Values one ulp below the maximum round up past the last bin in float32
+    rng = np.random.default_rng(0)
+
+    for _ in range(20):
+        lo, hi = np.sort(rng.uniform(-1000, 1000, size=2)).astype(np.float32)
+        data = rng.uniform(lo, hi, size=(4, 8, 8)).astype(np.float32)
+        data[:, ::2] = np.nextafter(hi, np.float32(-np.inf))
+        data[0, 0, 0] = hi
+        data[-1, -1, -1] = lo
+
+        joint = compute_joint_histogram(data, bins=(256, 128))
+
+        assert joint.counts.sum() == data.size
+        assert joint.counts[-1].sum() >= data[:, ::2].size
@@ -0,0 +1,140 @@
+import math
+
+import pytest
+
+from trame_color_opacity_editor.utils.latency import LatencyMetrics
+
+
+class State(dict):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+
+class RenderWindow:
+    """The observers of a ``vtkRenderWindow``, rendering calls them."""
+
+    def __init__(self):
+        self.observers = {}
+
+    def AddObserver(self, event, callback):
+        self.observers[event] = callback
+
+    def Render(self):
+        self.observers["StartEvent"](self, "StartEvent")
+        self.observers["EndEvent"](self, "EndEvent")
+
+
+def test_measure():
+    state = {}
+    metrics = LatencyMetrics()
+    metrics.bind(state)
+    assert state == {"latency_stamp": None, "latency_ack": None}
+
+    # Nothing to acknowledge until the editor sent a stamp
+    with metrics.measure():
+        pass
+    assert state["latency_ack"] is None
+
+    state["latency_stamp"] = {"id": 1}
+    with metrics.measure():
+        pass
+    with metrics.measure():
+        pass
+
+    ack = state["latency_ack"]
+    assert ack["id"] == 1
+    assert 0 <= ack["handler"] <= ack["server"]
+
+    kwargs = metrics.editor_kwargs()
+    assert kwargs["instrument"] is True
+    assert kwargs["v_model_latencyStamp"] == ("latency_stamp",)
+    assert kwargs["latency_ack"] == ("latency_ack",)
+
+
+def test_observe_render():
+    state = State()
+    window = RenderWindow()
+    metrics = LatencyMetrics()
+    metrics.bind(state)
+    metrics.observe_render(window)
+
+    # Rendered within the handlers, the acknowledgement already follows the image
+    state["latency_stamp"] = {"id": 1}
+    with metrics.measure():
+        window.Render()
+
+    ack = state["latency_ack"]
+    assert ack["id"] == 1
+    assert 0 <= ack["render"] <= ack["rendered"] <= ack["server"]
+
+    # Rendered afterwards, the render is acknowledged again
+    state["latency_stamp"] = {"id": 2}
+    with metrics.measure():
+        pass
+    assert state["latency_ack"]["id"] == 2
+    assert "render" not in state["latency_ack"]
+
+    window.Render()
+    ack = state["latency_ack"]
+    assert ack["id"] == 2
+    assert ack["handler"] <= ack["rendered"]
+
+    # Only the first render is attributed to the stamp
+    state["latency_ack"] = None
+    window.Render()
+    assert state["latency_ack"] is None
+
+
+def test_record_render():
+    metrics = LatencyMetrics()
+
+    metrics.record({"id": 1, "emit": 1, "roundtrip": 20, "server": 10, "handler": 4})
+    metrics.record({"id": 2, "emit": 2, "roundtrip": 20, "server": 10, "handler": 4})
+    assert metrics.summary()["frame"]["count"] == 0
+
+    metrics.record({"id": 1, "frame": 30, "render": 5, "rendered": 12})
+    metrics.record(
+        {
+            "id": 3,
+            "emit": 3,
+            "roundtrip": 20,
+            "server": 10,
+            "handler": 4,
+            "frame": 20,
+            "render": 2,
+            "rendered": 8,
+        }
+    )
+
+    # receipt: emit + 5, render / rendered: receipt + render / rendered, frame: emit + frame
+    assert metrics.percentiles("render", q=[0, 100]) == {"p0": 10, "p100": 11}
+    assert metrics.percentiles("rendered", q=[0, 100]) == {"p0": 16, "p100": 18}
+    assert metrics.percentiles("frame", q=[0, 100]) == {"p0": 23, "p100": 31}
+    assert metrics.summary()["frame"]["count"] == 2
+    assert metrics.summary()["ack"]["count"] == 3
+
+
+def test_record():
+    metrics = LatencyMetrics(maxlen=100)
+    assert math.isnan(metrics.summary()["ack"]["p50"])
+
+    for i in range(101):
+        metrics.record({"emit": i, "roundtrip": 20, "server": 10, "handler": 4})
+
+    assert len(metrics) == 100
+    # receipt: emit + (roundtrip - server) / 2, handler: receipt + handler, ack: emit + roundtrip
+    assert metrics.percentiles("emit", q=[0, 100]) == {"p0": 1, "p100": 100}
+    assert metrics.percentiles("receipt", q=[0]) == {"p0": 6}
+    assert metrics.percentiles("handler", q=[0]) == {"p0": 10}
+    assert metrics.percentiles("ack", q=[0]) == {"p0": 21}
+
+    summary = metrics.summary()
+    assert summary["ack"]["count"] == 100
+    assert summary["ack"]["mean"] == pytest.approx(70.5)
+    assert summary["emit"]["p50"] == pytest.approx(50.5)
+
+    metrics.reset()
+    assert len(metrics) == 0
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.cache import LRUCache
+from trame_color_opacity_editor.utils.lut import bake_lut, lut_cache
+
+
+def test_bake_lut():
+    color_nodes = [[0, [1, 0, 0]], [10, [0, 0, 1]]]
+    opacity_nodes = [[5, 0], [10, 1]]
+
+    lut = bake_lut(color_nodes, opacity_nodes, size=11)
+
+    assert lut.shape == (11, 4)
+    np.testing.assert_allclose(lut[0], [1, 0, 0, 0])
+    np.testing.assert_allclose(lut[5], [0.5, 0, 0.5, 0])
+    np.testing.assert_allclose(lut[8], [0.2, 0, 0.8, 0.6])
+    np.testing.assert_allclose(lut[10], [0, 0, 1, 1])
+
+    lut = bake_lut(color_nodes, size=3, scalar_range=[-10, 20], dtype=np.uint8)
+    np.testing.assert_array_equal(lut, [[255, 0, 0, 255], [128, 0, 128, 255], [0, 0, 255, 255]])
+
+
+def test_bake_lut_cache():
+    lut_cache.clear()
+    color_nodes = [[0, [1, 0, 0]], [10, [0, 0, 1]]]
+
+    lut = bake_lut(color_nodes, size=16)
+    assert bake_lut(np.array([[0, 1, 0, 0], [10, 0, 0, 1]]), size=16) is lut
+    assert lut_cache.hits == 1
+    assert bake_lut(color_nodes, size=32) is not lut
+
+    with pytest.raises(ValueError):
+        lut[0, 0] = 0
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_max_bytes():
+    cache = LRUCache(maxsize=10, max_bytes=100)
+    cache.put("a", np.zeros(40, dtype=np.uint8))
+    cache.put("b", np.zeros(40, dtype=np.uint8))
+    assert cache.get("a") is not None
+
+    cache.put("c", np.zeros(40, dtype=np.uint8))
+    assert "b" not in cache
+    assert cache.nbytes == 80
+
+    # An entry larger than the budget evicts everything else but is kept
+    cache.put("d", np.zeros(200, dtype=np.uint8))
+    assert len(cache) == 1
+    assert "d" in cache
+    assert cache.nbytes == 200
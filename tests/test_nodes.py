@@ -0,0 +1,91 @@
+import numpy as np
+
+from trame_color_opacity_editor.utils.nodes import merge_nodes, simplify_nodes
+
+
+def test_merge_nodes():
+    color_nodes = [[0, [1, 0, 0]], [10, [0, 0, 1]]]
+    opacity_nodes = [[5, 0], [10, 1], [20, 0.5]]
+
+    np.testing.assert_allclose(
+        merge_nodes(color_nodes, opacity_nodes),
+        [
+            [0, 1, 0, 0, 0],
+            [5, 0.5, 0, 0.5, 0],
+            [10, 0, 0, 1, 1],
+            [20, 0, 0, 1, 0.5],
+        ],
+    )
+
+    assert merge_nodes(color_nodes, []).shape == (0, 5)
+
+
+def walk_merge(colors, opacities):
+    # Transliteration of mergeNodes of the editor
+    def value_at(nodes, k, x):
+        if k == 0:
+            return nodes[0][1:]
+        if k == len(nodes):
+            return nodes[-1][1:]
+        x0, x1 = nodes[k - 1][0], nodes[k][0]
+        t = (x - x0) / (x1 - x0) if x1 > x0 else 1
+        return [a + t * (b - a) for a, b in zip(nodes[k - 1][1:], nodes[k][1:])]
+
+    merged = []
+    i = j = 0
+
+    while True:
+        color_x = colors[i][0] if i < len(colors) else np.inf
+        opacity_x = opacities[j][0] if j < len(opacities) else np.inf
+        x = min(color_x, opacity_x)
+
+        if not x < np.inf or not len(colors) or not len(opacities):
+            return merged
+
+        merged.append([x, *value_at(colors, i, x), *value_at(opacities, j, x)])
+        i += color_x <= opacity_x
+        j += opacity_x <= color_x
+
+
+def random_nodes(rng, size):
+    x = np.sort(rng.integers(0, 8, rng.integers(0, 6))).astype(float)
+    return np.column_stack((x, rng.random((len(x), size))))
+
+
+def test_merge_nodes_matches_editor():
+    rng = np.random.default_rng(0)
+
+    for _ in range(200):
+        # Few distinct x values, so that many are shared or repeated
+        colors = random_nodes(rng, 3)
+        opacities = random_nodes(rng, 1)
+
+        expected = np.array(walk_merge(colors.tolist(), opacities.tolist())).reshape(-1, 5)
+        np.testing.assert_allclose(merge_nodes(colors, opacities), expected)
+
+
+def test_simplify_nodes():
+    x = np.linspace(0, 100, 1001)
+    nodes = np.column_stack((x, np.sin(x / 10) * 0.5 + 0.5, x / 100, 1 - x / 100))
+
+    simplified, error = simplify_nodes(nodes, tolerance=1e-3)
+
+    assert len(simplified) < 100
+    assert error <= 1e-3
+    np.testing.assert_array_equal(simplified[[0, -1]], nodes[[0, -1]])
+
+    # The error reported is the largest interpolation error over the original nodes
+    interpolated = np.column_stack(
+        [np.interp(x, simplified[:, 0], simplified[:, i]) for i in range(1, 4)]
+    )
+    assert np.abs(interpolated - nodes[:, 1:]).max() == error
+
+
+def test_simplify_collinear_nodes():
+    nodes = np.column_stack((np.arange(10.0), np.arange(10.0) / 9))
+
+    simplified, error = simplify_nodes(nodes, tolerance=0)
+
+    np.testing.assert_array_equal(simplified, nodes[[0, -1]])
+    assert error < 1e-12
+    assert simplify_nodes(nodes[:1])[0].shape == (1, 2)
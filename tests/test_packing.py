@@ -0,0 +1,33 @@
+import numpy as np
+
+from trame_color_opacity_editor.utils.nodes import color_nodes_to_array
+from trame_color_opacity_editor.utils.packing import is_packed, pack_array, unpack_array
+from trame_color_opacity_editor.widgets import pack_array_defaults
+
+
+def test_pack_array():
+    nodes = np.array([[0, 1, 0, 0], [0.5, 0, 1, 0], [1, 0, 0, 1]])
+    packed = pack_array(nodes)
+
+    assert is_packed(packed)
+    assert packed["shape"] == [3, 4]
+    assert len(packed["buffer"]) == nodes.size * 4
+    np.testing.assert_array_equal(unpack_array(packed), nodes)
+
+    # What the editor sends back is accepted wherever nodes are
+    np.testing.assert_array_equal(color_nodes_to_array(packed), nodes)
+
+
+def test_pack_array_defaults():
+    histograms = np.ones((8, 2))
+    kwargs = {
+        "histograms": ("histograms", histograms),
+        "v_model_opacityNodes": ("opacities", [[0, 0], [1, 1]]),
+    }
+
+    pack_array_defaults(kwargs, ["histograms", "v_model_opacityNodes", "v_model_colorNodes"])
+
+    assert kwargs["histograms"][0] == "histograms"
+    np.testing.assert_array_equal(unpack_array(kwargs["histograms"][1]), histograms)
+    assert kwargs["v_model_opacityNodes"] == ("opacities", [[0, 0], [1, 1]])
+    assert "v_model_colorNodes" not in kwargs
@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.presets import (
+    PresetLibrary,
+    get_presets,
+    read_paraview_presets,
+    write_presets,
+)
+
+
+def test_presets_roundtrip(tmp_path):
+    path = tmp_path / "presets.bin"
+    write_presets(
+        path,
+        {
+            "RB": {"color": [[-1, 1, 0, 0], [1, 0, 0, 1]]},
+            "Ramp": {"color": [[0, 0, 0, 0], [2, 1, 1, 1]], "opacity": [[0, 0], [2, 1]]},
+        },
+    )
+
+    presets = PresetLibrary(path, cache_size=1)
+    assert presets.names() == ["RB", "Ramp"]
+    assert "Ramp" in presets and "Missing" not in presets
+    assert presets._cache.misses == 0
+
+    assert presets.color_nodes("RB") == [[0, [1, 0, 0]], [1, [0, 0, 1]]]
+    assert presets.color_nodes("RB", [10, 20]) == [[10, [1, 0, 0]], [20, [0, 0, 1]]]
+    np.testing.assert_array_equal(
+        presets.color_nodes("RB", as_array=True), [[0, 1, 0, 0], [1, 0, 0, 1]]
+    )
+    assert presets._cache.misses == 1
+    assert presets._cache.hits == 2
+
+    assert presets.opacity_nodes("RB") is None
+    assert presets.opacity_nodes("Ramp", [0, 4]) == [[0, 0], [4, 1]]
+    assert len(presets._cache) == 1
+
+    with pytest.raises(KeyError):
+        presets.color_nodes("Missing")
+
+
+def test_read_paraview_presets(tmp_path):
+    path = tmp_path / "ColorMaps.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"Name": "A", "ColorSpace": "Diverging", "RGBPoints": [0, 1, 0, 0, 1, 0, 0, 1]},
+                {"Name": "B", "IndexedColors": [1, 0, 0]},
+                {
+                    "Name": "C",
+                    "RGBPoints": [0, 0, 0, 0, 1, 1, 1, 1],
+                    "Points": [0, 0, 0.5, 0, 1, 1, 0.5, 0],
+                },
+            ]
+        )
+    )
+
+    presets = read_paraview_presets(path)
+    assert list(presets) == ["A", "C"]
+    np.testing.assert_array_equal(presets["C"]["opacity"], [[0, 0], [1, 1]])
+
+
+def test_read_paraview_presets_simplified(tmp_path):
+    x = np.linspace(0, 1, 1000)
+    points = np.column_stack((x, x, x**2, 1 - x))
+    path = tmp_path / "ColorMaps.json"
+    path.write_text(json.dumps([{"Name": "Dense", "RGBPoints": points.ravel().tolist()}]))
+
+    preset = read_paraview_presets(path, tolerance=1e-3)["Dense"]
+
+    assert len(preset["color"]) < 50
+    assert 0 < preset["error"] <= 1e-3
+
+
+def test_default_presets():
+    presets = get_presets()
+    assert presets is get_presets()
+    assert len(presets) > 0
+
+    for name in ["RBG", "WB", "viridis"]:
+        nodes = presets.color_nodes(name, [0, 100])
+        assert nodes[0][0] == 0 and nodes[-1][0] == 100
@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.nodes import color_nodes_to_array, opacity_nodes_to_array
+from trame_color_opacity_editor.utils.packing import pack_array
+from trame_color_opacity_editor.utils.store import ContentStore, is_stored
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ContentStore(tmp_path / "store", name="test_store")
+
+
+def test_put(store):
+    key = store.put(b"histogram")
+
+    assert store.put(b"histogram") == key
+    assert key in store
+    assert store.get(key) == b"histogram"
+    assert store.get("missing") is None
+    assert len(list(store.directory.iterdir())) == 1
+
+
+def test_invalid_keys(store):
+    store.put(b"histogram")
+
+    # Keys coming from a client never leave the directory
+    for key in ["..", "../store", "", "0" * 31]:
+        assert key not in store
+        assert store.get(key) is None
+        with pytest.raises(KeyError):
+            store.get_array({"dtype": "float32", "shape": [1, 2], "url": f"{store.name}/{key}"})
+
+
+def test_put_array(store):
+    array = np.array([[0, 0.5], [1, 0.25], [2, 1]])
+
+    reference = store.put_array(array)
+
+    assert is_stored(reference)
+    assert reference == store.put_array(pack_array(array))
+    assert reference["shape"] == [3, 2]
+    assert reference["url"] == store.url(reference["url"].rsplit("/", 1)[-1])
+    np.testing.assert_array_equal(store.get_array(reference), array)
+
+    # Stored nodes are read back from the store
+    np.testing.assert_array_equal(opacity_nodes_to_array(reference), array)
+    colors = np.array([[0, 1, 0, 0], [1, 0, 0, 1]])
+    np.testing.assert_array_equal(color_nodes_to_array(store.put_array(colors)), colors)
+
+
+def test_prune(store):
+    keys = [store.put(bytes([i]) * 100) for i in range(4)]
+
+    assert store.prune(max_bytes=250) == 200
+    assert sum(key in store for key in keys) == 2
+    assert store.prune(max_bytes=250) == 0
+
+
+def test_prune_keeps_hits(store):
+    keys = [store.put(bytes([i]) * 100) for i in range(4)]
+
+    for age, key in enumerate(keys):
+        os.utime(store.path(key), (1000 + age, 1000 + age))
+
+    # Putting the oldest again makes it the most recent
+    store.put(bytes([0]) * 100)
+    store.prune(max_bytes=250)
+
+    assert [key in store for key in keys] == [True, False, False, True]
+
+
+def test_put_after_external_prune(store):
+    key = store.put(b"histogram")
+
+    # Pruned by another process sharing the directory
+    other = ContentStore(store.directory, name="other_store")
+    assert other.prune(max_bytes=0) == len(b"histogram")
+    assert key not in store
+
+    assert store.put(b"histogram") == key
+    assert store.get(key) == b"histogram"
+
+
+def test_references_of_several_stores(tmp_path):
+    first = ContentStore(tmp_path / "first", name="first_store")
+    second = ContentStore(tmp_path / "second", name="second_store")
+    first_nodes = np.array([[0, 0], [1, 1]])
+    second_nodes = np.array([[0, 1], [1, 0]])
+
+    first_reference = first.put_array(first_nodes)
+    second_reference = second.put_array(second_nodes)
+
+    np.testing.assert_array_equal(opacity_nodes_to_array(first_reference), first_nodes)
+    np.testing.assert_array_equal(opacity_nodes_to_array(second_reference), second_nodes)
+
+    # Another store by the same name does not take over the references of the first
+    third = ContentStore(tmp_path / "third", name="first_store")
+    third.put_array(second_nodes)
+    np.testing.assert_array_equal(opacity_nodes_to_array(first_reference), first_nodes)
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.histograms import (
+    Histogram,
+    MultiResolutionHistogram,
+    compute_histogram,
+)
+from trame_color_opacity_editor.utils.suggest import (
+    SUGGESTION_METHODS,
+    find_peaks,
+    histogram_percentiles,
+    otsu_threshold,
+    suggest_transfer_function,
+)
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    return np.concatenate(
+        [
+            rng.normal(10, 3, 200_000),  # background
+            rng.normal(100, 5, 20_000),
+            rng.normal(180, 4, 10_000),
+        ]
+    )
+
+
+def test_histogram_percentiles(data):
+    histogram = compute_histogram(data, bins=4096)
+    np.testing.assert_allclose(
+        histogram_percentiles(histogram, [1, 50, 99]), np.percentile(data, [1, 50, 99]), atol=0.1
+    )
+
+
+def test_histogram_percentiles_gap():
+    # No percentile falls within the empty bins
+    histogram = Histogram(np.array([100] + [0] * 8 + [100]), np.linspace(0, 10, 11))
+    np.testing.assert_allclose(
+        histogram_percentiles(histogram, [0, 25, 75, 100]), [0, 0.5, 9.5, 10]
+    )
+
+
+def test_otsu_threshold():
+    histogram = compute_histogram(np.array([0] * 10 + [1] * 10 + [8] * 10 + [9] * 10), bins=10)
+    assert 1 < otsu_threshold(histogram) <= 8
+
+
+def test_find_peaks(data):
+    histogram = compute_histogram(data, bins=512)
+    peaks = find_peaks(histogram, count=3)
+
+    np.testing.assert_allclose([center for center, _, _ in peaks], [10, 100, 180], atol=1)
+    for center, left, right in peaks:
+        assert left < center < right
+
+
+@pytest.mark.parametrize("method", SUGGESTION_METHODS)
+def test_suggest_transfer_function(data, method):
+    histogram = MultiResolutionHistogram(compute_histogram(data, bins=1 << 16))
+    opacity, color = suggest_transfer_function(histogram, method)
+
+    assert opacity.scalar_range == color.scalar_range == histogram.scalar_range
+    assert np.all(np.diff(opacity.x) > 0)
+    assert np.all(np.diff(color.x) > 0)
+    assert opacity.nodes[:, 1].max() == 1
+
+    # The background stays (almost) transparent, the features don't
+    assert opacity(10) < 0.05
+    assert opacity(180) > 0.5
+
+    if method != "percentiles":
+        assert opacity(10) == 0
+
+    if method == "peaks":
+        assert opacity(140) == 0
+
+
+def test_suggest_transfer_function_errors(data):
+    histogram = compute_histogram(data, bins=256)
+
+    with pytest.raises(ValueError):
+        suggest_transfer_function(histogram, "unknown")
+
+    # Without peaks, falls back to the percentiles
+    uniform = compute_histogram(np.arange(256, dtype=np.uint8), bins=256)
+    opacity, _ = suggest_transfer_function(uniform, "peaks")
+    assert opacity(255) == 1
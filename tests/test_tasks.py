@@ -0,0 +1,192 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.histograms import MultiResolutionHistogram, compute_histogram
+from trame_color_opacity_editor.utils.store import ContentStore
+from trame_color_opacity_editor.utils.tasks import HistogramUpdater, LatestTask
+
+
+class State(dict):
+    """The part of the trame state used by the updater, recording the flushes."""
+
+    def __init__(self):
+        super().__init__()
+        self.flushes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.flushes.append(dict(self))
+
+
+@pytest.fixture
+def histogram():
+    data = np.random.default_rng(0).normal(size=(16, 32, 32))
+    return MultiResolutionHistogram(compute_histogram(data, bins=4096))
+
+
+def test_latest_task():
+    release = threading.Event()
+
+    def slow(value):
+        release.wait(timeout=10)
+        return value
+
+    async def main():
+        task = LatestTask()
+        first = asyncio.ensure_future(task.run(slow, 1))
+        await asyncio.sleep(0)
+        assert task.pending
+
+        second = asyncio.ensure_future(task.run(slow, 2))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == 2
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert not task.pending
+
+    asyncio.run(main())
+
+
+def test_update(histogram):
+    state = State()
+    updater = HistogramUpdater(state, histograms_range="hist_y_range", scalar_range="x_range")
+
+    async def main():
+        return await updater.update(histogram.rebin, [-1, 1], 64)
+
+    assert asyncio.run(main())
+
+    expected = histogram.rebin([-1, 1], 64)
+    assert state.flushes[0] == {"histograms_pending": True}
+    assert state["histograms"] == expected.histograms()
+    assert state["hist_y_range"] == expected.histograms_range()
+    assert state["x_range"] == expected.scalar_range
+    assert state["histograms_pending"] is False
+
+
+def test_stale_update(histogram):
+    state = State()
+    updater = HistogramUpdater(state)
+    release = threading.Event()
+
+    def slow_rebin(scalar_range):
+        release.wait(timeout=10)
+        return histogram.rebin(scalar_range, 64)
+
+    async def main():
+        stale = asyncio.ensure_future(updater.update(slow_rebin, [-2, 2]))
+        await asyncio.sleep(0)
+        latest = asyncio.ensure_future(updater.update(slow_rebin, [0, 1]))
+        await asyncio.sleep(0)
+
+        # The previous histogram stays, marked as pending
+        assert "histograms" not in state
+        assert state["histograms_pending"] is True
+
+        release.set()
+        return await stale, await latest
+
+    assert asyncio.run(main()) == (False, True)
+    assert state["histograms"] == histogram.rebin([0, 1], 64).histograms()
+    assert state["histograms_pending"] is False
+    # The stale update never reached the state
+    assert sum("histograms" in flush for flush in state.flushes) == 1
+
+
+def test_update_error():
+    state = State()
+    updater = HistogramUpdater(state)
+
+    def fail():
+        raise ValueError("no data")
+
+    async def main():
+        await updater.update(fail)
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+    assert state["histograms_pending"] is False
+    assert "histograms" not in state
+
+
+def test_update_store(histogram, tmp_path):
+    state = State()
+    store = ContentStore(tmp_path / "store", name="test_tasks_store")
+    updater = HistogramUpdater(state)
+
+    async def main():
+        await updater.update(histogram.rebin, None, 64, store=store)
+
+    asyncio.run(main())
+
+    expected = np.array(histogram.rebin(None, 64).histograms(), dtype=np.float32)
+    np.testing.assert_array_equal(store.get_array(state["histograms"]), expected)
+
+
+def test_show(histogram):
+    state = State()
+    updater = HistogramUpdater(state, histograms_range="hist_y_range", scalar_range="x_range")
+    release = threading.Event()
+    expected = histogram.rebin([-1, 1], 64)
+
+    def slow():
+        release.wait(timeout=10)
+        return histogram.rebin(None, 64)
+
+    async def main():
+        update = asyncio.ensure_future(updater.update(slow))
+        await asyncio.sleep(0)
+
+        # A histogram shown meanwhile is not replaced by the update in progress
+        updater.show(expected)
+        release.set()
+
+        assert await update is False
+
+    asyncio.run(main())
+
+    assert state["histograms"] == expected.histograms()
+    assert state["hist_y_range"] == expected.histograms_range()
+    assert state["x_range"] == expected.scalar_range
+    assert state["histograms_pending"] is False
+
+
+def test_cancel(histogram):
+    state = State()
+    updater = HistogramUpdater(state)
+    release = threading.Event()
+
+    def slow():
+        release.wait(timeout=10)
+        return histogram.rebin(None, 64)
+
+    async def main():
+        update = asyncio.ensure_future(updater.update(slow))
+        await asyncio.sleep(0)
+        updater.cancel()
+        release.set()
+        superseded = await update
+
+        # Cancelling the awaiting task still raises
+        release.clear()
+        update = asyncio.ensure_future(updater.update(slow))
+        await asyncio.sleep(0)
+        update.cancel()
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await update
+
+        return superseded
+
+    assert asyncio.run(main()) is False
+    assert state["histograms_pending"] is False
+    assert "histograms" not in state
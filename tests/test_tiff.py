@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.histograms import compute_histogram
+from trame_color_opacity_editor.utils.tiff import load_tiff, read_tiff_info
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def write_tiff(path, volume):
+    frames = [Image.fromarray(frame) for frame in volume]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32])
+def test_load_tiff(tmp_path, dtype):
+    rng = np.random.default_rng(0)
+    volume = (rng.random((5, 7, 9)) * 1000).astype(dtype)
+    path = tmp_path / "volume.tiff"
+    write_tiff(path, volume)
+
+    assert read_tiff_info(path) == ((5, 7, 9), np.dtype(dtype))
+
+    calls = []
+    loaded = load_tiff(path, histogram_bins=16, progress=lambda i, n: calls.append((i, n)))
+
+    np.testing.assert_array_equal(loaded.data, volume)
+    assert calls == [(i + 1, 5) for i in range(5)]
+    assert loaded.scalar_range == [float(volume.min()), float(volume.max())]
+
+    expected = compute_histogram(volume, bins=16)
+    np.testing.assert_array_equal(loaded.histogram.counts, expected.counts)
+    np.testing.assert_array_equal(loaded.histogram.edges, expected.edges)
+
+
+def test_load_tiff_mmap(tmp_path):
+    volume = np.arange(3 * 4 * 5, dtype=np.uint16).reshape(3, 4, 5)
+    path = tmp_path / "volume.tiff"
+    write_tiff(path, volume)
+
+    loaded = load_tiff(path, mmap_path=tmp_path / "volume.npy")
+    assert isinstance(loaded.data, np.memmap)
+    assert loaded.histogram is None
+    assert loaded.scalar_range == [0, 59]
+
+    np.testing.assert_array_equal(np.load(tmp_path / "volume.npy", mmap_mode="r"), volume)
+
+
+def test_load_bilevel_tiff(tmp_path):
+    volume = np.random.default_rng(0).random((3, 8, 8)) > 0.5
+    path = tmp_path / "volume.tiff"
+    write_tiff(path, volume)
+
+    assert read_tiff_info(path) == ((3, 8, 8), np.dtype(np.uint8))
+
+    loaded = load_tiff(path, histogram_bins=2)
+
+    np.testing.assert_array_equal(loaded.data, volume)
+    assert loaded.scalar_range == [0.0, 1.0]
+    assert loaded.histogram.counts.tolist() == [np.sum(~volume), np.sum(volume)]
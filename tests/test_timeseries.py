@@ -0,0 +1,118 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.histograms import compute_histogram
+from trame_color_opacity_editor.utils.timeseries import HistogramScheduler
+
+
+def make_steps(count):
+    rng = np.random.default_rng(0)
+    return [rng.normal(step, 1, size=(8, 16, 16)).astype(np.float32) for step in range(count)]
+
+
+def test_request():
+    steps = make_steps(6)
+    ready = []
+    scheduler = HistogramScheduler(
+        lambda step: steps[step], len(steps), bins=64, prefetch=2, on_ready=ready.append
+    )
+
+    try:
+        statistics = scheduler.request(1).result(timeout=10)
+        expected = compute_histogram(steps[1], bins=64, max_workers=1)
+
+        assert statistics.step == 1
+        assert statistics.scalar_range == expected.scalar_range
+        np.testing.assert_array_equal(statistics.histogram.counts, expected.counts)
+
+        # The following steps are prefetched without becoming current
+        deadline = time.monotonic() + 10
+        while (
+            not (2 in scheduler.cache and 3 in scheduler.cache and ready)
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+
+        assert 2 in scheduler.cache and 3 in scheduler.cache
+        assert 4 not in scheduler.cache
+        assert [statistics.step for statistics in ready] == [1]
+
+        # A cached step is ready at once
+        ready.clear()
+        assert scheduler.request(1).done()
+        assert [statistics.step for statistics in ready] == [1]
+    finally:
+        scheduler.shutdown()
+
+
+def test_current_step_first():
+    steps = make_steps(8)
+    started = threading.Event()
+    release = threading.Event()
+    loaded = []
+
+    def load_step(step):
+        loaded.append(step)
+        if len(loaded) == 1:
+            started.set()
+            release.wait(timeout=10)
+        return steps[step]
+
+    scheduler = HistogramScheduler(load_step, len(steps), bins=16, prefetch=3, max_workers=1)
+
+    try:
+        scheduler.request(0)
+        started.wait(timeout=10)
+
+        # Steps 1-3 were queued behind step 0, jumping to step 5 drops them
+        future = scheduler.request(5)
+        release.set()
+        future.result(timeout=10)
+        deadline = time.monotonic() + 10
+        while not (6 in scheduler.cache and 7 in scheduler.cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert loaded == [0, 5, 6, 7]
+    finally:
+        scheduler.shutdown()
+
+
+def test_max_bytes():
+    steps = make_steps(6)
+    scheduler = HistogramScheduler(lambda step: steps[step], len(steps), bins=64, prefetch=0)
+    size = scheduler.request(0).result(timeout=10).nbytes
+    scheduler.shutdown()
+
+    scheduler = HistogramScheduler(
+        lambda step: steps[step], len(steps), bins=64, prefetch=0, max_bytes=2 * size
+    )
+
+    try:
+        for step in range(4):
+            scheduler.request(step).result(timeout=10)
+
+        assert len(scheduler.cache) == 2
+        assert scheduler.get(3) is not None
+        assert scheduler.get(0) is None
+    finally:
+        scheduler.shutdown()
+
+
+def test_error():
+    def load_step(step):
+        raise OSError(step)
+
+    scheduler = HistogramScheduler(load_step, 3, prefetch=0)
+
+    try:
+        assert isinstance(scheduler.request(0).exception(timeout=10), OSError)
+    finally:
+        scheduler.shutdown()
+
+
+def test_steps():
+    with pytest.raises(ValueError):
+        HistogramScheduler(lambda step: None, 0)
@@ -0,0 +1,102 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from trame_color_opacity_editor.utils.packing import unpack_array
+from trame_color_opacity_editor.utils.transfer_function import (
+    ColorTransferFunction,
+    OpacityTransferFunction,
+)
+
+
+def test_opacity_transfer_function():
+    tf = OpacityTransferFunction([[10, 1], [0, 0]])
+    assert tf.to_nodes() == [[0, 0], [10, 1]]
+
+    assert tf.insert(5, 0.25) == 1
+    assert tf.insert(5, 0.75) == 1
+    assert len(tf) == 3
+    np.testing.assert_allclose(tf([-1, 2.5, 5, 7.5, 20]), [0, 0.375, 0.75, 0.875, 1])
+
+    tf.node_modified(1, [4, 0.5])
+    tf.node_added(1, [2, 0.1])
+    tf.node_removed(0)
+    assert tf.to_nodes() == [[2, 0.1], [4, 0.5], [10, 1]]
+
+    with pytest.raises(ValueError):
+        tf.nodes[0, 0] = 1
+
+
+def test_color_transfer_function():
+    tf = ColorTransferFunction.linear([[1, 0, 0], [0, 1, 0], [0, 0, 1]], [0, 100])
+    assert tf.to_nodes() == [[0, [1, 0, 0]], [50, [0, 1, 0]], [100, [0, 0, 1]]]
+    np.testing.assert_allclose(tf([25, 200]), [[0.5, 0.5, 0], [0, 0, 1]])
+    np.testing.assert_array_equal(unpack_array(tf.to_packed()), tf.nodes)
+
+
+def test_simplify():
+    opacity = OpacityTransferFunction(np.column_stack((np.arange(100.0), np.arange(100.0) % 2)))
+    assert opacity.simplify(0.5) == 0
+    assert len(opacity) == 100
+
+    opacity = OpacityTransferFunction([[0, 0], [1, 0.5], [2, 1.001], [3, 1]])
+    error = opacity.simplify(0.01)
+    assert len(opacity) == 3
+    assert error == pytest.approx(0.0005)
+
+
+def test_scaling():
+    tf = OpacityTransferFunction([[10, 0], [20, 2]])
+
+    scaled = tf.scale([10, 30], [0, 2])
+    assert scaled.to_nodes() == [[0, 0], [0.5, 1]]
+    assert scaled.unscale([10, 30], [0, 2]).to_nodes() == tf.to_nodes()
+
+    assert tf.rescale([0, 100]).to_nodes() == [[0, 0], [100, 2]]
+
+    # Colors are only scaled along x, like scaleNodes
+    colors = ColorTransferFunction([[0, [1, 0, 0]], [10, [0, 0, 1]]])
+    assert colors.scale([0, 10], [0, 2]).to_nodes() == [[0, [1, 0, 0]], [1, [0, 0, 1]]]
+
+
+def test_bind():
+    trame_server = pytest.importorskip("trame_server")
+    server = trame_server.Server("test_bind")
+
+    tf = OpacityTransferFunction([[0, 0], [1, 1]])
+    tf.bind(server.state, "opacities")
+    assert server.state.opacities == [[0, 0], [1, 1]]
+
+    tf.insert(0.5, 0.25)
+    assert server.state.opacities == [[0, 0], [0.5, 0.25], [1, 1]]
+
+    # Updates from the editor reload the nodes
+    server.state.ready()
+    with server.state:
+        server.state.opacities = [[0, 1], [1, 0]]
+    assert tf.to_nodes() == [[0, 1], [1, 0]]
+
+    # Once rebound elsewhere, the previous variable no longer drives the nodes
+    tf.bind(server.state, "other_opacities")
+    with server.state:
+        server.state.opacities = [[0, 0.5], [1, 0.5]]
+    assert tf.to_nodes() == [[0, 1], [1, 0]]
+
+    tf.unbind()
+    with server.state:
+        server.state.other_opacities = [[0, 0], [1, 1]]
+    assert tf.to_nodes() == [[0, 1], [1, 0]]
+
+
+def test_degenerate_functions():
+    single = OpacityTransferFunction([[5, 0.5]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert single.rescale([0, 100]).to_nodes() == [[50, 0.5]]
+
+    assert OpacityTransferFunction([[5, 0], [5, 1]]).rescale([0, 10]).x.tolist() == [5, 5]
+
+    np.testing.assert_array_equal(OpacityTransferFunction()([0, 1]), [0, 0])
+    assert ColorTransferFunction()([0, 1, 2]).shape == (3, 3)
+    assert ColorTransferFunction()(0.5).shape == (3,)
@@ -0,0 +1,138 @@
+import pytest
+
+pytest.importorskip("vtkmodules")
+
+from vtkmodules.vtkCommonDataModel import vtkPiecewiseFunction  # noqa: E402
+from vtkmodules.vtkRenderingCore import vtkColorTransferFunction  # noqa: E402
+
+from trame_color_opacity_editor.utils.packing import pack_array, unpack_array  # noqa: E402
+from trame_color_opacity_editor.utils.vtk import (  # noqa: E402
+    ColorFunctionSync,
+    OpacityFunctionSync,
+    update_color_function,
+    update_opacity_function,
+)
+
+
+def test_update_opacity_function():
+    pwf = vtkPiecewiseFunction()
+    nodes = [[0, 0], [10, 0.5], [20, 1]]
+
+    assert update_opacity_function(pwf, nodes)
+    assert pwf.GetSize() == 3
+    assert pwf.GetValue(15) == pytest.approx(0.75)
+
+    # Same content, nothing to do
+    assert not update_opacity_function(pwf, nodes)
+
+    # Modified outside of the helper, the content must be restored
+    pwf.AddPoint(5, 1)
+    assert update_opacity_function(pwf, nodes)
+    assert pwf.GetSize() == 3
+
+    assert update_opacity_function(pwf, [])
+    assert pwf.GetSize() == 0
+
+
+def test_update_color_function():
+    ctf = vtkColorTransferFunction()
+    nodes = [[0, [1, 0, 0]], [10, [0, 0, 1]]]
+
+    assert update_color_function(ctf, nodes)
+    assert ctf.GetSize() == 2
+    assert ctf.GetColor(5) == pytest.approx((0.5, 0, 0.5))
+    assert not ctf.GetAllowDuplicateScalars()
+
+    assert not update_color_function(ctf, nodes)
+    assert update_color_function(ctf, nodes, force=True)
+
+
+def test_opacity_function_sync():
+    nodes = [[0, 0], [10, 0.5], [20, 1]]
+    pwf = vtkPiecewiseFunction()
+    sync = OpacityFunctionSync(pwf, get_nodes=lambda: nodes)
+    assert pwf.GetSize() == 3
+
+    nodes[1] = [12, 0.25]
+    assert sync.node_modified(1, nodes[1])
+    assert pwf.GetValue(12) == pytest.approx(0.25)
+
+    nodes.insert(1, [5, 1])
+    assert sync.node_added(1, nodes[1])
+    assert pwf.GetSize() == 4
+
+    del nodes[2]
+    assert sync.node_removed(2)
+    assert pwf.GetSize() == 3
+
+    # The v-model update following the events has nothing left to do
+    assert not sync.set_nodes(nodes)
+    assert sync.resync_count == 0
+
+    # Drift: the function was modified elsewhere
+    pwf.RemoveAllPoints()
+    nodes[0] = [0, 0.5]
+    assert sync.node_modified(0, nodes[0])
+    assert sync.resync_count == 1
+    assert pwf.GetSize() == 3
+    assert pwf.GetValue(0) == pytest.approx(0.5)
+
+    # Drift: the index does not match the known nodes, the resync finds nothing to change
+    assert not sync.node_removed(7)
+    assert sync.resync_count == 2
+
+
+def test_opacity_function_sync_packed():
+    # The packed v-model rounds the float64 node events to float32
+    nodes = [[0, 0], [0.1, 0.3], [1, 1]]
+    pwf = vtkPiecewiseFunction()
+    sync = OpacityFunctionSync(pwf, get_nodes=lambda: pack_array(nodes))
+
+    for tick in range(1, 5):
+        nodes[1] = [0.1 + tick / 30, 0.3 + tick / 70]
+        assert sync.node_modified(1, nodes[1])
+        assert not sync.set_nodes(pack_array(nodes))
+
+    assert sync.resync_count == 0
+    assert not sync.node_modified(1, unpack_array(pack_array(nodes))[1].tolist())
+
+
+def test_sync_drift_with_stale_nodes():
+    # The v-model update lags behind the node events
+    stale = [[0, 0], [10, 0.5], [20, 1]]
+    pwf = vtkPiecewiseFunction()
+    sync = OpacityFunctionSync(pwf, get_nodes=lambda: stale)
+
+    pwf.AddPoint(30, 1)
+    assert sync.node_added(1, [5, 1])
+    assert sync.resync_count == 1
+    assert pwf.GetSize() == 4
+    assert pwf.GetValue(5) == pytest.approx(1)
+
+    pwf.AddPoint(30, 1)
+    assert sync.node_modified(0, [0, 0.25])
+    assert pwf.GetValue(0) == pytest.approx(0.25)
+    assert pwf.GetValue(5) == pytest.approx(1)
+
+    pwf.AddPoint(30, 1)
+    assert sync.node_removed(1)
+    assert sync.resync_count == 3
+    assert pwf.GetSize() == 3
+    assert pwf.GetValue(5) == pytest.approx(0.375)
+
+
+def test_color_function_sync():
+    nodes = [[0, [1, 0, 0]], [10, [0, 0, 1]]]
+    ctf = vtkColorTransferFunction()
+    sync = ColorFunctionSync(ctf, get_nodes=lambda: nodes)
+
+    nodes.insert(1, [5, [0, 1, 0]])
+    assert sync.node_added(1, nodes[1])
+    assert ctf.GetColor(5) == pytest.approx((0, 1, 0))
+
+    nodes[1] = [5, [1, 1, 1]]
+    assert sync.node_modified(1, nodes[1])
+    assert ctf.GetColor(5) == pytest.approx((1, 1, 1))
+
+    assert not sync.set_nodes(nodes)
+    assert sync.resync_count == 0
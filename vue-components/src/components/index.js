@@ -1,4 +1,5 @@
 import ColorOpacityEditor from './ColorOpacityEditor.vue'
+import PresetPicker from './PresetPicker.vue'
 import NodeScaler from './internal/NodeScaler.vue'
 import ViewportContainer from './internal/ViewportContainer.vue'
 import BackgroundShaper from './internal/BackgroundShaper.vue'
@@ -12,6 +13,7 @@ import NodeFlattener from './internal/NodeFlattener.vue'
 
 export default {
   trameCoeColorOpacityEditor: ColorOpacityEditor,
+  trameCoePresetPicker: PresetPicker,
   trameCoeNodeScaler: NodeScaler,
   trameCoeNodeMerger: NodeMerger,
   trameCoeNodeFlattener: NodeFlattener,
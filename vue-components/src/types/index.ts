@@ -24,3 +24,72 @@ export type ColorOpacityNode = MapNode<RGBAColor>
  * A point in 2D space
  */
 export type Point = Vector2D
+
+/**
+ * A (N, C) array of numbers packed as little-endian float32 values
+ */
+export type PackedArray = {
+  dtype: 'float32'
+  shape: [number, number]
+  buffer: Uint8Array | ArrayBuffer
+}
+
+/**
+ * A reference to a (N, C) float32 array of the content store of the server, fetched once
+ */
+export type StoredArray = {
+  dtype: 'float32'
+  shape: [number, number]
+  url: string
+  // Identifies the store of the server, the reference is sent back as is
+  store?: number
+}
+
+/**
+ * A PNG image spanning the scalars of `range` over the width of the editor
+ */
+export type BackgroundImage = {
+  // The PNG, or its URL in the content store. Binary state values are decoded into their own
+  // ArrayBuffer, never a SharedArrayBuffer, which `Blob` does not accept
+  image: Uint8Array<ArrayBuffer> | ArrayBuffer | string
+  range: Vector2D
+}
+
+/**
+ * Stamp of a batch of node edits, sent along with the v-model update
+ */
+export type LatencyStamp = {
+  id: number
+}
+
+/**
+ * Acknowledgement of a stamp by the server, times in milliseconds
+ */
+export type LatencyAck = {
+  id: number
+  // from the receipt of the stamp to the acknowledgement
+  server: number
+  // spent in the handlers of the update
+  handler: number
+  // from the receipt of the stamp to the start / end of the render of the view, once
+  // rendered: the acknowledgement then follows the rendered image
+  render?: number
+  rendered?: number
+}
+
+/**
+ * Timings of a batch of node edits observed by the editor, in milliseconds
+ */
+export type LatencyReport = {
+  id: number
+  // from the first edit to the v-model update
+  emit?: number
+  // from the v-model update to the acknowledgement
+  roundtrip?: number
+  server?: number
+  handler?: number
+  // from the v-model update to the acknowledgement of the render, see `LatencyAck`
+  frame?: number
+  render?: number
+  rendered?: number
+}
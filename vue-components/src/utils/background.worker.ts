@@ -0,0 +1,35 @@
+import { drawCanvasBackground } from '@/utils/canvas'
+import type { OffscreenMessage } from '@/utils/offscreen'
+
+// Draws the background canvases handed over by `attachOffscreen`, see `utils/offscreen`
+const contexts = new Map<number, OffscreenCanvasRenderingContext2D>()
+
+self.onmessage = ({ data }: MessageEvent<OffscreenMessage>) => {
+  if (data.canvas) {
+    const context = data.canvas.getContext('2d')
+
+    if (context) {
+      contexts.set(data.id, context)
+    }
+  }
+
+  if (data.detach) {
+    contexts.delete(data.id)
+    return
+  }
+
+  const context = contexts.get(data.id)
+
+  if (!context || !data.background) {
+    return
+  }
+
+  const { size, padding, contentSize, shape, nodes } = data.background
+
+  if (context.canvas.width !== size[0] || context.canvas.height !== size[1]) {
+    context.canvas.width = size[0]
+    context.canvas.height = size[1]
+  }
+
+  drawCanvasBackground(context, size, padding, contentSize, shape, nodes)
+}
@@ -23,21 +23,104 @@ export function mouseToPixel(m: Vector2D, rect: DOMRect): Vector2D {
   return [m[0] - rect.left, m[1] - rect.top]
 }
 
-export function pickNodeOnCanvas(
+export type PickedNode = { id: number; type: 'handle' | 'edge' }
+
+// First index of the sorted nodes whose pixel x is not below `x`
+function lowerBoundPixelX(
+  x: number,
+  nodes: OpacityNode[],
+  size: Vector2D,
+  padding: Vector2D,
+  contentSize: Vector2D,
+): number {
+  let lo = 0
+  let hi = nodes.length
+
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1
+
+    if (fractionToPixel(nodes[mid]!, size, padding, contentSize)[0] < x) {
+      lo = mid + 1
+    } else {
+      hi = mid
+    }
+  }
+
+  return lo
+}
+
+function distanceToSegment(p: Vector2D, a: Vector2D, b: Vector2D): number {
+  const dx = b[0] - a[0]
+  const dy = b[1] - a[1]
+  const length2 = dx * dx + dy * dy
+  let t = length2 > 0 ? ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length2 : 0
+  t = Math.min(Math.max(t, 0), 1)
+  return Math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+}
+
+/**
+ * Hit test the handles, then the edges, of nodes sorted by x.
+ *
+ * Only the nodes within `handleRadius` pixels of `p` along x are visited (binary search),
+ * so picking costs O(log N) whatever the number of nodes. The closest hit wins.
+ */
+export function pickNode(
   p: Vector2D,
-  context: CanvasRenderingContext2D,
-): { id: number; type: 'handle' | 'edge' } | null {
-  const color = context.getImageData(p[0], p[1], 1, 1).data
-
-  // the picking canvas is transparent anywhere but where the nodes are
-  if (color[3] === 255) {
-    return {
-      id: color[1]!,
-      type: color[0] == 0 ? 'handle' : 'edge',
+  nodes: OpacityNode[],
+  size: Vector2D,
+  padding: Vector2D,
+  contentSize: Vector2D,
+  handleRadius: number,
+  edgeRadius: number,
+): PickedNode | null {
+  let picked: PickedNode | null = null
+  let closest = handleRadius
+
+  for (
+    let i = lowerBoundPixelX(p[0] - handleRadius, nodes, size, padding, contentSize);
+    i < nodes.length;
+    i++
+  ) {
+    const q = fractionToPixel(nodes[i]!, size, padding, contentSize)
+
+    if (q[0] > p[0] + handleRadius) {
+      break
+    }
+
+    const distance = Math.hypot(q[0] - p[0], q[1] - p[1])
+
+    if (distance <= closest) {
+      closest = distance
+      picked = { id: i, type: 'handle' }
     }
   }
 
-  return null
+  if (picked || edgeRadius <= 0 || nodes.length < 2) {
+    return picked
+  }
+
+  closest = edgeRadius
+
+  // The edge ending at the first node right of the pick area may still cross it
+  const first = Math.max(lowerBoundPixelX(p[0] - edgeRadius, nodes, size, padding, contentSize), 1)
+
+  for (let i = first; i < nodes.length; i++) {
+    const a = fractionToPixel(nodes[i - 1]!, size, padding, contentSize)
+
+    if (a[0] > p[0] + edgeRadius) {
+      break
+    }
+
+    const b = fractionToPixel(nodes[i]!, size, padding, contentSize)
+    const distance = distanceToSegment(p, a, b)
+
+    if (distance <= closest) {
+      closest = distance
+      picked = { id: i - 1, type: 'edge' }
+    }
+  }
+
+  return picked
 }
 
 export function getNodeBounds(nodeId: number, nodes: OpacityNode[], epsilon: number): Vector4D {
@@ -73,7 +156,7 @@ export function clampNodeToBounds(f: Vector2D, bounds: Vector4D): Vector2D {
 }
 
 export function drawCanvasBackground(
-  context: CanvasRenderingContext2D,
+  context: CanvasRenderingContext2D | OffscreenCanvasRenderingContext2D,
   size: Vector2D,
   padding: Vector2D,
   contentSize: Vector2D,
@@ -126,9 +209,39 @@ export function drawCanvasBackground(
   // context.closePath();
 }
 
+/**
+ * Stretch `image` over the content area, its `range` being mapped into `xRange`
+ */
+export function drawCanvasImage(
+  context: CanvasRenderingContext2D,
+  size: Vector2D,
+  padding: Vector2D,
+  contentSize: Vector2D,
+  image: CanvasImageSource,
+  range: Vector2D,
+  xRange: Vector2D,
+) {
+  context.clearRect(0, 0, size[0], size[1])
+
+  const span = xRange[1] - xRange[0]
+
+  if (span <= 0) {
+    return
+  }
+
+  const p0 = fractionToPixel([(range[0] - xRange[0]) / span, 1], size, padding, contentSize)
+  const p1 = fractionToPixel([(range[1] - xRange[0]) / span, 0], size, padding, contentSize)
+
+  context.save()
+  context.beginPath()
+  context.rect(padding[0], padding[1], contentSize[0], contentSize[1])
+  context.clip()
+  context.drawImage(image, p0[0], p0[1], p1[0] - p0[0], p1[1] - p0[1])
+  context.restore()
+}
+
 export function drawCanvasControls(
   context: CanvasRenderingContext2D,
-  pickerContext: CanvasRenderingContext2D,
   size: Vector2D,
   padding: Vector2D,
   contentSize: Vector2D,
@@ -140,29 +253,16 @@ export function drawCanvasControls(
   borderColor: RGBAColor,
 ) {
   context.clearRect(0, 0, size[0], size[1])
-  pickerContext.clearRect(0, 0, size[0], size[1])
 
   if (showLine && nodes.length > 1) {
     context.beginPath()
 
-    pickerContext.lineWidth = radius * 3
-    pickerContext.beginPath()
-
     const [x, y] = fractionToPixel(nodes[0]!, size, padding, contentSize)
     context.moveTo(x, y)
-    pickerContext.moveTo(x, y)
 
     for (let i = 1; i < nodes.length; ++i) {
       const [x, y] = fractionToPixel(nodes[i]!, size, padding, contentSize)
-
-      pickerContext.strokeStyle = `rgb(${1}, ${i - 1}, ${0})`
-
       context.lineTo(x, y)
-
-      pickerContext.lineTo(x, y)
-      pickerContext.stroke()
-      pickerContext.beginPath()
-      pickerContext.moveTo(x, y)
     }
 
     context.strokeStyle = `rgba(${borderColor[0]}, ${borderColor[1]}, ${borderColor[2]}, ${borderColor[3]})`
@@ -173,20 +273,18 @@ export function drawCanvasControls(
     context.stroke()
   }
 
+  // All the handles in a single path, filled and stroked once
   context.fillStyle = `rgba(${color[0]}, ${color[1]}, ${color[2]}, ${color[3]})`
   context.strokeStyle = `rgba(${borderColor[0]}, ${borderColor[1]}, ${borderColor[2]}, ${borderColor[3]})`
   context.lineWidth = 2
+  context.beginPath()
+
   for (let i = 0; i < nodes.length; ++i) {
     const [x, y] = fractionToPixel(nodes[i]!, size, padding, contentSize)
-    context.beginPath()
+    context.moveTo(x + radius, y)
     context.arc(x, y, radius, 0, 2 * Math.PI)
-    context.fill()
-    context.stroke()
-
-    // Use unique color needed to build the color to node map
-    pickerContext.fillStyle = `rgb(${0}, ${i}, ${i})`
-    pickerContext.beginPath()
-    pickerContext.arc(x, y, radius * 3, 0, 2 * Math.PI)
-    pickerContext.fill()
   }
+
+  context.fill()
+  context.stroke()
 }
@@ -0,0 +1,34 @@
+/**
+ * Coalesce canvas redraws to at most one per animation frame.
+ *
+ * A draw requested several times before the next frame runs once. The draws of all the
+ * views of the page share a single `requestAnimationFrame` callback.
+ */
+const pending = new Set<() => void>()
+let frame: number | undefined = undefined
+
+function flush() {
+  frame = undefined
+
+  const draws = [...pending]
+  pending.clear()
+
+  draws.forEach((draw) => draw())
+}
+
+export function requestDraw(draw: () => void) {
+  pending.add(draw)
+
+  if (frame === undefined) {
+    frame = requestAnimationFrame(flush)
+  }
+}
+
+export function cancelDraw(draw: () => void) {
+  pending.delete(draw)
+
+  if (pending.size === 0 && frame !== undefined) {
+    cancelAnimationFrame(frame)
+    frame = undefined
+  }
+}
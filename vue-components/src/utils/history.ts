@@ -0,0 +1,175 @@
+import type { MapNode } from '@/types'
+
+export type NodeEdit<T> =
+  | { type: 'modify'; index: number; before: MapNode<T>; after: MapNode<T> }
+  | { type: 'add'; index: number; node: MapNode<T> }
+  | { type: 'remove'; index: number; node: MapNode<T> }
+
+export type HistoryEntry = {
+  list: 'color' | 'opacity'
+  edits: NodeEdit<unknown>[]
+}
+
+function invertEdit<T>(edit: NodeEdit<T>): NodeEdit<T> {
+  switch (edit.type) {
+    case 'modify':
+      return { type: 'modify', index: edit.index, before: edit.after, after: edit.before }
+    case 'add':
+      return { type: 'remove', index: edit.index, node: edit.node }
+    case 'remove':
+      return { type: 'add', index: edit.index, node: edit.node }
+  }
+}
+
+/**
+ * The edits undoing `entry`, in the order to apply them
+ */
+export function invertEntry(entry: HistoryEntry): HistoryEntry {
+  return { list: entry.list, edits: entry.edits.map(invertEdit).reverse() }
+}
+
+/**
+ * Apply edits to a copy of `nodes`
+ */
+export function applyEdits<T>(nodes: MapNode<T>[], edits: NodeEdit<T>[]): MapNode<T>[] {
+  const result = [...nodes]
+
+  edits.forEach((edit) => {
+    if (edit.type === 'modify') {
+      result[edit.index] = edit.after
+    } else if (edit.type === 'add') {
+      result.splice(edit.index, 0, edit.node)
+    } else {
+      result.splice(edit.index, 1)
+    }
+  })
+
+  return result
+}
+
+/**
+ * Undo/redo history of the node edits, as deltas in a bounded ring buffer.
+ *
+ * Every entry only holds the nodes it touched. The edits recorded between `begin` and `end`
+ * (a drag) make a single entry, where the successive moves of a node are merged into one.
+ * The oldest entries are dropped once `capacity` is reached.
+ */
+export class EditHistory {
+  private entries: (HistoryEntry | undefined)[]
+  private start = 0
+  private length = 0
+  // Number of entries that can be undone, the following ones can be redone
+  private position = 0
+  private transaction: HistoryEntry[] | undefined = undefined
+
+  constructor(private capacity: number) {
+    this.entries = new Array(Math.max(capacity, 0))
+  }
+
+  get undoCount(): number {
+    return this.position
+  }
+
+  get redoCount(): number {
+    return this.length - this.position
+  }
+
+  begin() {
+    this.transaction = []
+  }
+
+  end() {
+    const entries = this.transaction ?? []
+    this.transaction = undefined
+    entries.forEach((entry) => this.push(entry))
+  }
+
+  record<T>(list: 'color' | 'opacity', edit: NodeEdit<T>) {
+    if (this.capacity <= 0) {
+      return
+    }
+
+    if (this.transaction === undefined) {
+      this.push({ list, edits: [edit as NodeEdit<unknown>] })
+      return
+    }
+
+    let entry = this.transaction[this.transaction.length - 1]
+
+    if (entry === undefined || entry.list !== list) {
+      entry = { list, edits: [] }
+      this.transaction.push(entry)
+    }
+
+    const last = entry.edits[entry.edits.length - 1] as NodeEdit<T> | undefined
+
+    if (edit.type === 'modify' && last?.index === edit.index) {
+      // A node moving during the drag, only its first and latest positions are kept
+      if (last.type === 'modify') {
+        entry.edits[entry.edits.length - 1] = { ...last, after: edit.after }
+        return
+      } else if (last.type === 'add') {
+        entry.edits[entry.edits.length - 1] = { ...last, node: edit.after }
+        return
+      }
+    }
+
+    entry.edits.push(edit as NodeEdit<unknown>)
+  }
+
+  /**
+   * The entry to revert, see `invertEntry`
+   */
+  undo(): HistoryEntry | undefined {
+    if (this.position === 0) {
+      return undefined
+    }
+
+    this.position--
+    return this.entries[(this.start + this.position) % this.capacity]
+  }
+
+  /**
+   * The entry to apply again
+   */
+  redo(): HistoryEntry | undefined {
+    if (this.position === this.length) {
+      return undefined
+    }
+
+    const entry = this.entries[(this.start + this.position) % this.capacity]
+    this.position++
+    return entry
+  }
+
+  clear() {
+    this.entries.fill(undefined)
+    this.start = 0
+    this.length = 0
+    this.position = 0
+    this.transaction = undefined
+  }
+
+  private push(entry: HistoryEntry) {
+    if (entry.edits.length === 0) {
+      return
+    }
+
+    // A new edit drops what could be redone
+    for (let i = this.position; i < this.length; i++) {
+      this.entries[(this.start + i) % this.capacity] = undefined
+    }
+
+    this.length = this.position
+
+    if (this.length === this.capacity) {
+      this.entries[this.start] = undefined
+      this.start = (this.start + 1) % this.capacity
+      this.length--
+    }
+
+    this.entries[(this.start + this.length) % this.capacity] = entry
+    this.length++
+    this.position = this.length
+  }
+}
@@ -0,0 +1,77 @@
+import type { LatencyAck, LatencyReport, LatencyStamp } from '@/types'
+
+// Stamps that were never acknowledged are dropped past this count
+const MAX_PENDING_STAMPS = 64
+
+/**
+ * Stamp the node edits and turn the acknowledgements of the server into latency reports.
+ *
+ * Every edit until the next v-model update belongs to the same stamp, the time of the
+ * first one is the start of the measure. A stamp is acknowledged once its handlers are done,
+ * then once more when the server rendered it (see `LatencyAck`): each acknowledgement makes
+ * a report, or a single one when the render is acknowledged along with the handlers.
+ */
+export class LatencyTracker {
+  private editTime: number | undefined = undefined
+  private nextId = 1
+  private sent = new Map<number, { edit: number; emit: number; acknowledged: boolean }>()
+
+  edit() {
+    if (this.editTime === undefined) {
+      this.editTime = performance.now()
+    }
+  }
+
+  stamp(): LatencyStamp | undefined {
+    if (this.editTime === undefined) {
+      return undefined
+    }
+
+    const id = this.nextId++
+    this.sent.set(id, { edit: this.editTime, emit: performance.now(), acknowledged: false })
+    this.editTime = undefined
+
+    if (this.sent.size > MAX_PENDING_STAMPS) {
+      this.sent.delete(this.sent.keys().next().value!)
+    }
+
+    return { id }
+  }
+
+  acknowledge(ack: LatencyAck): LatencyReport | undefined {
+    const sent = this.sent.get(ack.id)
+    const rendered = ack.render !== undefined && ack.rendered !== undefined
+
+    if (sent === undefined || (sent.acknowledged && !rendered)) {
+      return undefined
+    }
+
+    const now = performance.now()
+    const report: LatencyReport = { id: ack.id }
+
+    if (!sent.acknowledged) {
+      sent.acknowledged = true
+      report.emit = sent.emit - sent.edit
+      report.roundtrip = now - sent.emit
+      report.server = ack.server
+      report.handler = ack.handler
+
+      // Acknowledging a stamp supersedes the older ones
+      for (const id of this.sent.keys()) {
+        if (id < ack.id) {
+          this.sent.delete(id)
+        }
+      }
+    }
+
+    // The render is acknowledged once its image was sent, over the same connection
+    if (rendered) {
+      report.frame = now - sent.emit
+      report.render = ack.render
+      report.rendered = ack.rendered
+      this.sent.delete(ack.id)
+    }
+
+    return report
+  }
+}
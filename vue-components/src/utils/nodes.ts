@@ -1,6 +1,13 @@
 import type { MapNode as ExtMapNode } from '@colormap/core/dist/types'
 
-import type { MapNode, ColorNode, OpacityNode, Vector2D } from '@/types'
+import type {
+  MapNode,
+  ColorNode,
+  ColorOpacityNode,
+  OpacityNode,
+  RGBColor,
+  Vector2D,
+} from '@/types'
 
 export class MapNodeAdapter<T> implements ExtMapNode<T> {
   _node: MapNode<T>
@@ -172,3 +179,148 @@ export function unscaleNode<T>(node: MapNode<T>, xRange?: Vector2D, yRange?: Vec
 
   return node
 }
+
+// Index of the first node whose x is above `x`
+function upperBound<T>(nodes: MapNode<T>[], x: number): number {
+  let lo = 0
+  let hi = nodes.length
+
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1
+
+    if (nodes[mid]![0] <= x) {
+      lo = mid + 1
+    } else {
+      hi = mid
+    }
+  }
+
+  return lo
+}
+
+// Linear interpolation at `x`, clamped outside of the nodes, `k` being the index of the
+// first node whose x is not below `x`
+function colorAt(nodes: ColorNode[], k: number, x: number): RGBColor {
+  if (k === 0) {
+    return nodes[0]![1]
+  }
+
+  if (k === nodes.length) {
+    return nodes[k - 1]![1]
+  }
+
+  const [x0, c0] = nodes[k - 1]!
+  const [x1, c1] = nodes[k]!
+  const t = x1 > x0 ? (x - x0) / (x1 - x0) : 1
+
+  return [c0[0] + t * (c1[0] - c0[0]), c0[1] + t * (c1[1] - c0[1]), c0[2] + t * (c1[2] - c0[2])]
+}
+
+function opacityAt(nodes: OpacityNode[], k: number, x: number): number {
+  if (k === 0) {
+    return nodes[0]![1]
+  }
+
+  if (k === nodes.length) {
+    return nodes[k - 1]![1]
+  }
+
+  const [x0, o0] = nodes[k - 1]!
+  const [x1, o1] = nodes[k]!
+  const t = x1 > x0 ? (x - x0) / (x1 - x0) : 1
+
+  return o0 + t * (o1 - o0)
+}
+
+/**
+ * Merge sorted color and opacity nodes into color-opacity nodes.
+ *
+ * A merged node is created at the x of every node of either list, the other list being
+ * interpolated linearly (and clamped) at that x. Only the merged nodes strictly between
+ * `lo` and `hi` are returned. The lists are walked once: O(N + M).
+ */
+export function mergeNodes(
+  colorNodes: ColorNode[],
+  opacityNodes: OpacityNode[],
+  lo: number = -Infinity,
+  hi: number = Infinity,
+): ColorOpacityNode[] {
+  const merged: ColorOpacityNode[] = []
+
+  if (colorNodes.length === 0 || opacityNodes.length === 0) {
+    return merged
+  }
+
+  let i = upperBound(colorNodes, lo)
+  let j = upperBound(opacityNodes, lo)
+
+  while (true) {
+    const colorValue = i < colorNodes.length ? colorNodes[i]![0] : Infinity
+    const opacityValue = j < opacityNodes.length ? opacityNodes[j]![0] : Infinity
+    const value = Math.min(colorValue, opacityValue)
+
+    if (!(value < hi)) {
+      break
+    }
+
+    // Both indices point at the first node not below `value`
+    const color = colorAt(colorNodes, i, value)
+    const opacity = opacityAt(opacityNodes, j, value)
+    merged.push([value, [color[0], color[1], color[2], opacity]])
+
+    if (colorValue == opacityValue) {
+      i++
+      j++
+    } else if (colorValue < opacityValue) {
+      i++
+    } else {
+      j++
+    }
+  }
+
+  return merged
+}
+
+/**
+ * Index of the only node that differs between two lists of the same length,
+ * -1 when they are equal, undefined when more than one node differs.
+ */
+export function findModifiedNode<T>(
+  previous: MapNode<T>[],
+  nodes: MapNode<T>[],
+): number | undefined {
+  if (previous === nodes) {
+    return -1
+  }
+
+  if (previous.length !== nodes.length) {
+    return undefined
+  }
+
+  let modified = -1
+
+  for (let i = 0; i < nodes.length; i++) {
+    const a = previous[i]!
+    const b = nodes[i]!
+
+    if (a === b || (a[0] === b[0] && sameMapped(a[1], b[1]))) {
+      continue
+    }
+
+    if (modified >= 0) {
+      return undefined
+    }
+
+    modified = i
+  }
+
+  return modified
+}
+
+function sameMapped(a: unknown, b: unknown): boolean {
+  if (Array.isArray(a) && Array.isArray(b)) {
+    return a.length === b.length && a.every((v, i) => v === b[i])
+  }
+
+  return a === b
+}
@@ -0,0 +1,109 @@
+import type { ColorNode, ColorOpacityNode, Vector2D } from '@/types'
+// Bundled into the library as a blob URL: a UMD build has no `import.meta.url` to resolve a
+// separate worker file against, nor a known path it would be served from
+import BackgroundWorker from './background.worker?worker&inline'
+
+/**
+ * Draw background canvases from a worker, through `OffscreenCanvas`.
+ *
+ * A single worker is shared by all the canvases of the page. Once attached, a canvas is
+ * controlled by the worker only: it is resized and drawn by `drawOffscreen`. If the worker
+ * fails, every attached canvas is given up through its `onFallback`, and is to be replaced by a
+ * new canvas drawn on the main thread.
+ */
+export type OffscreenBackground = {
+  size: Vector2D
+  padding: Vector2D
+  contentSize: Vector2D
+  shape: Vector2D[]
+  nodes: ColorNode[] | ColorOpacityNode[]
+}
+
+export type OffscreenMessage = {
+  id: number
+  canvas?: OffscreenCanvas
+  detach?: boolean
+  background?: OffscreenBackground
+}
+
+let worker: Worker | undefined = undefined
+let failed = false
+let nextId = 0
+const fallbacks = new Map<number, () => void>()
+
+function fail(event: Event) {
+  console.error('Offscreen background rendering failed, drawing on the main thread', event)
+  failed = true
+  worker?.terminate()
+  worker = undefined
+
+  const callbacks = [...fallbacks.values()]
+  fallbacks.clear()
+  callbacks.forEach((callback) => callback())
+}
+
+function getWorker(): Worker | undefined {
+  if (worker === undefined && !failed) {
+    let created: Worker
+
+    try {
+      created = new BackgroundWorker()
+    } catch (error) {
+      // e.g. blob: workers forbidden by the Content-Security-Policy
+      console.error('Offscreen background rendering unavailable, drawing on the main thread', error)
+      failed = true
+      return undefined
+    }
+
+    created.onerror = fail
+    created.onmessageerror = fail
+    worker = created
+  }
+
+  return worker
+}
+
+export function supportsOffscreen(canvas: HTMLCanvasElement): boolean {
+  return (
+    typeof Worker !== 'undefined' &&
+    'transferControlToOffscreen' in canvas &&
+    getWorker() !== undefined
+  )
+}
+
+/**
+ * Hand the canvas over to the worker, returns the id to draw it with.
+ *
+ * To be called once `supportsOffscreen` returned `true`. `onFallback` is called if the worker
+ * fails, the canvas can no longer be drawn.
+ */
+export function attachOffscreen(canvas: HTMLCanvasElement, onFallback: () => void): number {
+  const id = nextId++
+  const offscreen = canvas.transferControlToOffscreen()
+  fallbacks.set(id, onFallback)
+  worker?.postMessage({ id, canvas: offscreen }, [offscreen])
+  return id
+}
+
+export function detachOffscreen(id: number) {
+  fallbacks.delete(id)
+  worker?.postMessage({ id, detach: true })
+}
+
+export function drawOffscreen(id: number, background: OffscreenBackground) {
+  if (worker === undefined) {
+    return
+  }
+
+  // Plain copies, reactive proxies can't be cloned to the worker
+  worker.postMessage({
+    id,
+    background: {
+      size: [background.size[0], background.size[1]],
+      padding: [background.padding[0], background.padding[1]],
+      contentSize: [background.contentSize[0], background.contentSize[1]],
+      shape: background.shape.map((p) => [p[0], p[1]]),
+      nodes: background.nodes.map(([x, color]) => [x, [...color]]),
+    },
+  })
+}
@@ -0,0 +1,67 @@
+import type { MapNode, PackedArray } from '@/types'
+
+export function isPackedArray(value: unknown): value is PackedArray {
+  return typeof value === 'object' && value !== null && 'buffer' in value && 'shape' in value
+}
+
+function toFloat32Array(buffer: Uint8Array | ArrayBuffer): Float32Array {
+  if (buffer instanceof ArrayBuffer) {
+    return new Float32Array(buffer)
+  }
+
+  // A Float32Array view needs a 4 bytes aligned offset, copy otherwise
+  if (buffer.byteOffset % 4 == 0) {
+    return new Float32Array(buffer.buffer, buffer.byteOffset, buffer.byteLength / 4)
+  }
+
+  return new Float32Array(buffer.slice().buffer)
+}
+
+/**
+ * Decode a packed (N, 2) array into [[x, y], ...] nodes,
+ * or a packed (N, 4) array into [[x, [r, g, b]], ...] nodes
+ */
+export function unpackNodes<T>(packed: PackedArray): MapNode<T>[] {
+  const data = toFloat32Array(packed.buffer)
+  const [n, columns] = packed.shape
+  const nodes = new Array<MapNode<unknown>>(n)
+
+  if (columns == 4) {
+    for (let i = 0; i < n; i++) {
+      const j = i * 4
+      nodes[i] = [data[j]!, [data[j + 1]!, data[j + 2]!, data[j + 3]!]]
+    }
+  } else {
+    for (let i = 0; i < n; i++) {
+      const j = i * columns
+      nodes[i] = [data[j]!, data[j + 1]!]
+    }
+  }
+
+  return nodes as MapNode<T>[]
+}
+
+/**
+ * Pack [[x, y], ...] or [[x, [r, g, b]], ...] nodes into a (N, columns) array
+ */
+export function packNodes<T>(nodes: MapNode<T>[], columns: number): PackedArray {
+  const data = new Float32Array(nodes.length * columns)
+
+  for (let i = 0; i < nodes.length; i++) {
+    const [x, mapped] = nodes[i]!
+    const j = i * columns
+    data[j] = x
+
+    if (Array.isArray(mapped)) {
+      data.set(mapped, j + 1)
+    } else {
+      data[j + 1] = mapped as number
+    }
+  }
+
+  return { dtype: 'float32', shape: [nodes.length, columns], buffer: new Uint8Array(data.buffer) }
+}
+
+export function maybeUnpackNodes<T>(nodes: MapNode<T>[] | PackedArray): MapNode<T>[] {
+  return isPackedArray(nodes) ? unpackNodes<T>(nodes) : nodes
+}
@@ -0,0 +1,83 @@
+import { shallowRef, watch, type ShallowRef } from 'vue'
+
+import type { PackedArray, StoredArray } from '@/types'
+
+/**
+ * Fetch the immutable content referenced by the server (see `utils.store` in Python).
+ *
+ * The content is addressed by its hash, so a URL is fetched once for all the editors of the
+ * page, and the responses are cached by the browser across page loads.
+ */
+const contents = new Map<string, Promise<ArrayBuffer>>()
+
+export function isStoredArray(value: unknown): value is StoredArray {
+  return typeof value === 'object' && value !== null && 'url' in value && 'shape' in value
+}
+
+export function fetchContent(url: string): Promise<ArrayBuffer> {
+  let content = contents.get(url)
+
+  if (content === undefined) {
+    content = fetch(url).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Failed to fetch ${url}: ${response.status}`)
+      }
+
+      return response.arrayBuffer()
+    })
+
+    // Failures are not cached, the next use tries again
+    content.catch(() => contents.delete(url))
+    contents.set(url, content)
+  }
+
+  return content
+}
+
+export async function fetchStoredArray(stored: StoredArray): Promise<PackedArray> {
+  return { dtype: stored.dtype, shape: stored.shape, buffer: await fetchContent(stored.url) }
+}
+
+/**
+ * Resolve `value` when it is a stored array, once fetched: stale fetches are ignored
+ */
+export function resolveStored<T>(
+  value: T | PackedArray | StoredArray,
+  apply: (value: T | PackedArray) => void,
+  isCurrent: () => boolean = () => true,
+) {
+  if (!isStoredArray(value)) {
+    apply(value)
+    return
+  }
+
+  fetchStoredArray(value).then(
+    (packed) => {
+      if (isCurrent()) {
+        apply(packed)
+      }
+    },
+    (error) => console.error(error),
+  )
+}
+
+/**
+ * A ref following `getter`, with the stored arrays replaced by their content once fetched
+ */
+export function useResolvedArray<T>(
+  getter: () => T | PackedArray | StoredArray,
+  initial: T | PackedArray,
+): ShallowRef<T | PackedArray> {
+  const resolved = shallowRef<T | PackedArray>(initial)
+
+  watch(
+    getter,
+    (value) => {
+      const apply = (content: T | PackedArray) => (resolved.value = content)
+      resolveStored(value, apply, () => getter() === value)
+    },
+    { immediate: true },
+  )
+
+  return resolved
+}
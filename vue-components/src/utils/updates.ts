@@ -0,0 +1,73 @@
+export type UpdatePolicy = 'immediate' | 'throttle' | 'release'
+
+/**
+ * Coalesce updates sent out of the editor while a handle is dragged.
+ *
+ * Updates are keyed, a newer update replaces a pending one with the same key (latest wins).
+ * - 'immediate': every update is sent right away
+ * - 'throttle': pending updates are sent at most `maxRate` times per second
+ * - 'release': pending updates are sent when the drag ends
+ * Pending updates are always sent when the drag ends.
+ */
+export class UpdateCoalescer {
+  private pending = new Map<string, () => void>()
+  private timer: ReturnType<typeof setTimeout> | undefined = undefined
+  private lastFlush = 0
+  private dragging = false
+
+  constructor(
+    private getPolicy: () => UpdatePolicy,
+    private getMaxRate: () => number,
+  ) {}
+
+  push(key: string, update: () => void) {
+    this.pending.set(key, update)
+    this.schedule()
+  }
+
+  setDragging(dragging: boolean) {
+    this.dragging = dragging
+
+    if (!dragging) {
+      this.flush()
+    }
+  }
+
+  flush() {
+    if (this.timer !== undefined) {
+      clearTimeout(this.timer)
+      this.timer = undefined
+    }
+
+    const updates = [...this.pending.values()]
+    this.pending.clear()
+    this.lastFlush = performance.now()
+
+    updates.forEach((update) => update())
+  }
+
+  private schedule() {
+    const policy = this.getPolicy()
+    const maxRate = this.getMaxRate()
+
+    if (!this.dragging || policy === 'immediate' || (policy === 'throttle' && !(maxRate > 0))) {
+      this.flush()
+      return
+    }
+
+    if (policy === 'release' || this.timer !== undefined) {
+      return
+    }
+
+    const wait = this.lastFlush + 1000 / maxRate - performance.now()
+
+    if (wait <= 0) {
+      this.flush()
+    } else {
+      this.timer = setTimeout(() => {
+        this.timer = undefined
+        this.flush()
+      }, wait)
+    }
+  }
+}